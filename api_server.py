@@ -1,7 +1,9 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g
 from flask_cors import CORS
 import os
+import re
 import sys
+import threading
 from dotenv import load_dotenv
 import logging
 from pathlib import Path
@@ -13,8 +15,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
 # Import our trading bot modules
-from bot.client import BinanceFuturesClient
-from bot.orders import OrderManager
+from bot.analytics import fetch_funding, fetch_trades
+from bot.pool import ClientPool, DEFAULT_ACCOUNT
+from bot.ratelimit import RateLimitTimeout
+from bot.heartbeat import AutoCancelHeartbeat
+from bot.algos import ExecutionEngine, TWAPAlgo, IcebergAlgo, BracketAlgo
+from bot.recorder import STREAMS, TickReader, TickRecorder
+from bot.health import HealthMonitor
+from bot.validators import OrderValidator
+from bot.vault import mask
 from bot.logging_config import setup_logging
 
 # Setup logging
@@ -23,32 +32,145 @@ logger = setup_logging()
 app = Flask(__name__, static_folder='../frontend')
 CORS(app)  # Enable CORS for all routes
 
-# Global variables
-client = None
-order_manager = None
 
-def initialize_client():
-    """Initialize Binance client with environment variables"""
-    global client, order_manager
+class AccountRoutingMiddleware:
+    """
+    Route /api/accounts/<account>/... to the plain /api/... endpoints
+
+    The account from the path is stored in the WSGI environ, where it takes
+    precedence over the X-Account header.
+    """
     
-    api_key = os.getenv('BINANCE_API_KEY')
-    api_secret = os.getenv('BINANCE_API_SECRET')
+    PREFIX = '/api/accounts/'
     
-    if not api_key or not api_secret:
-        logger.error("API credentials not found in environment variables")
-        return False
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
     
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith(self.PREFIX):
+            account, _, remainder = path[len(self.PREFIX):].partition('/')
+            environ['trading_bot.account'] = account
+            environ['PATH_INFO'] = '/api/' + remainder
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = AccountRoutingMiddleware(app.wsgi_app)
+
+# Per-account clients served by this worker
+pool = ClientPool.from_env()
+if not pool.accounts():
+    logger.error("API credentials not found in environment variables")
+
+# Auto-cancel heartbeats by account
+heartbeats = {}
+heartbeats_lock = threading.Lock()
+
+# Algo execution engines by account
+engines = {}
+engines_lock = threading.Lock()
+
+# Market data fetched by the endpoints is kept on disk (RECORD_TICKS=0 disables)
+TICK_DIR = os.getenv('TICK_DIR', 'data/ticks')
+DAY_PATTERN = re.compile(r'[0-9]{8}')
+MAX_TICKS = 10000
+recorder = None
+if os.getenv('RECORD_TICKS', '1') != '0':
+    recorder = TickRecorder(TICK_DIR)
+    recorder.start()
+
+# Background health monitors by account
+monitors = {}
+monitors_lock = threading.Lock()
+HEALTH_INTERVAL = float(os.getenv('HEALTH_INTERVAL', 15))
+
+def record_ticks(method: str, *args):
+    """Pass market data to the tick recorder; recording never fails a request"""
+    if recorder is None:
+        return
+    try:
+        getattr(recorder, method)(*args)
+    except Exception as e:
+        logger.error(f"Failed to record ticks: {str(e)}")
+
+ALGO_TYPES = {
+    'TWAP': (TWAPAlgo, ['symbol', 'side', 'quantity', 'duration', 'slices']),
+    'ICEBERG': (IcebergAlgo, ['symbol', 'side', 'quantity', 'price', 'display_qty']),
+    'BRACKET': (BracketAlgo, ['symbol', 'side', 'quantity', 'stop_loss', 'take_profit']),
+}
+
+def current_account():
+    """Account addressed by the current request"""
+    return (request.environ.get('trading_bot.account')
+            or request.headers.get('X-Account')
+            or DEFAULT_ACCOUNT)
+
+def get_client():
+    """Binance client for the current request's account"""
+    try:
+        return pool.get_client(g.account)
+    except Exception as e:
+        logger.error(f"Failed to initialize client for {g.account}: {str(e)}")
+        return None
+
+def get_order_manager():
+    """OrderManager for the current request's account"""
     try:
-        client = BinanceFuturesClient(api_key, api_secret, testnet=True)
-        order_manager = OrderManager(client)
-        logger.info("Binance client initialized successfully")
-        return True
+        return pool.get_order_manager(g.account)
     except Exception as e:
-        logger.error(f"Failed to initialize client: {str(e)}")
-        return False
+        logger.error(f"Failed to initialize client for {g.account}: {str(e)}")
+        return None
 
-# Initialize client on startup
-initialize_client()
+def get_analytics():
+    """AnalyticsEngine for the current request's account"""
+    try:
+        return pool.get_analytics(g.account)
+    except Exception as e:
+        logger.error(f"Failed to initialize client for {g.account}: {str(e)}")
+        return None
+
+def error_status(error: Exception) -> int:
+    """HTTP status for an unexpected error: 429 when the request weight limit timed out"""
+    return 429 if isinstance(error, RateLimitTimeout) else 500
+
+def get_monitor(account: str = None):
+    """Health monitor for an account (the current request's by default), started on first use"""
+    account = account or g.account
+    monitor = monitors.get(account)
+    if monitor is not None:
+        return monitor
+    
+    # Concurrent first requests must not each start a probe thread
+    with monitors_lock:
+        monitor = monitors.get(account)
+        if monitor is not None:
+            return monitor
+        client = pool.get_client(account)
+        if client is None:
+            return None
+        monitor = HealthMonitor(client, interval=HEALTH_INTERVAL,
+                                stream_times=recorder.last_event_times if recorder else None)
+        try:
+            monitor.probe()
+        except Exception as e:
+            logger.error(f"Initial health probe failed for {account}: {str(e)}")
+        monitor.start()
+        monitors[account] = monitor
+    return monitor
+
+# Worker-wide endpoints that are not tied to one account's shard
+SHARDLESS_PATHS = ('/api/accounts', '/api/health/live', '/api/health/ready')
+
+@app.before_request
+def route_account():
+    """Resolve the request's account and reject accounts owned by another shard"""
+    g.account = current_account()
+    if (request.path.startswith('/api/') and request.path not in SHARDLESS_PATHS
+            and not pool.owns(g.account)):
+        return jsonify({
+            'status': 'error',
+            'message': f'Account {g.account} is served by shard {pool.ring.shard_for(g.account)}',
+            'shard': pool.ring.shard_for(g.account)
+        }), 421
 
 @app.route('/')
 def serve_frontend():
@@ -63,27 +185,97 @@ def serve_static(path):
 # API Routes
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health of the account's exchange connection, from the latest background probe"""
+    try:
+        monitor = get_monitor()
+    except Exception as e:
+        logger.error(f"Failed to initialize client for {g.account}: {str(e)}")
+        monitor = None
+    if monitor is None:
+        return jsonify({
+            'status': 'down',
+            'message': 'Client not initialized',
+            'account': g.account,
+            'connected': False
+        })
+    report = monitor.report()
+    return jsonify(dict(
+        report,
+        message='Trading Bot API is running',
+        account=g.account,
+        connected=report['status'] != 'down'
+    ))
+
+def local_monitors():
+    """Monitors of every configured account this worker serves (None until started)"""
+    return {name: monitors.get(name) for name in pool.accounts() if pool.owns(name)}
+
+def start_monitors():
+    """Start the monitors of this worker's accounts, so readiness does not wait for traffic"""
+    for name in local_monitors():
+        try:
+            get_monitor(name)
+        except Exception as e:
+            logger.error(f"Failed to start health monitor for {name}: {str(e)}")
+
+# Probing takes a round trip per account: start them off the import path
+threading.Thread(target=start_monitors, name='health-startup', daemon=True).start()
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness():
+    """Liveness probe: the process serves requests and no monitor thread has stalled"""
+    stalled = [name for name, monitor in monitors.items() if not monitor.live()]
+    return jsonify({
+        'status': 'ok' if not stalled else 'error',
+        'stalled': stalled
+    }), 200 if not stalled else 503
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness probe: every account served by this worker can reach the exchange
+
+    Only reads the monitors started at startup; an account not probed yet
+    counts as not ready.
+    """
+    try:
+        accounts = {name: monitor.ready() if monitor else False
+                    for name, monitor in local_monitors().items()}
+    except Exception as e:
+        logger.error(f"Readiness check failed: {str(e)}")
+        accounts = {}
+    ready = bool(accounts) and all(accounts.values())
+    return jsonify({
+        'status': 'ok' if ready else 'error',
+        'accounts': accounts
+    }), 200 if ready else 503
+
+@app.route('/api/accounts', methods=['GET'])
+def list_accounts():
+    """List configured accounts and the shard serving each"""
     return jsonify({
-        'status': 'ok',
-        'message': 'Trading Bot API is running',
-        'connected': client is not None
+        'status': 'success',
+        'shard': pool.shard,
+        'accounts': [
+            {'account': name, 'shard': pool.ring.shard_for(name), 'local': pool.owns(name)}
+            for name in pool.accounts()
+        ]
     })
 
 @app.route('/api/connect', methods=['POST'])
 def test_connection():
-    """Test connection to Binance"""
+    """Test connection to Binance, served from the health monitor's cached probe"""
     try:
-        if client and client.test_connectivity():
-            account_info = client.get_account_info()
+        monitor = get_monitor()
+        if monitor and monitor.report()['status'] != 'down':
+            account = monitor.account()
+            if account is None:
+                monitor.refresh_account()
+                account = monitor.account()
             return jsonify({
                 'status': 'success',
                 'message': 'Connected to Binance Futures Testnet',
-                'account': {
-                    'total_balance': account_info.get('totalWalletBalance'),
-                    'available_balance': account_info.get('availableBalance'),
-                    'account_type': account_info.get('accountType')
-                }
+                'account': account
             })
         else:
             return jsonify({
@@ -95,7 +287,7 @@ def test_connection():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/place-order', methods=['POST'])
 def place_order():
@@ -132,13 +324,21 @@ def place_order():
                 'message': 'Invalid side. Must be BUY or SELL'
             }), 400
         
+        order_manager = get_order_manager()
+        if order_manager is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+        
         # Place order
         response = order_manager.place_order(
             symbol=symbol,
             side=side,
             order_type=order_type,
             quantity=quantity,
-            price=price
+            price=price,
+            client_order_id=data.get('client_order_id')
         )
         
         return jsonify({
@@ -148,6 +348,7 @@ def place_order():
         })
         
     except ValueError as e:
+        # Includes RiskCheckError
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -157,7 +358,7 @@ def place_order():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/orders', methods=['GET'])
 def get_orders():
@@ -166,6 +367,7 @@ def get_orders():
         symbol = request.args.get('symbol')
         limit = int(request.args.get('limit', 50))
         
+        client = get_client()
         if client:
             if symbol:
                 orders = client.client.futures_get_all_orders(symbol=symbol, limit=limit)
@@ -187,7 +389,7 @@ def get_orders():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/orders/<order_id>', methods=['GET'])
 def get_order(order_id):
@@ -195,6 +397,7 @@ def get_order(order_id):
     try:
         symbol = request.args.get('symbol', 'BTCUSDT')
         
+        client = get_client()
         if client:
             order = client.client.futures_get_order(symbol=symbol, orderId=order_id)
             return jsonify({
@@ -211,16 +414,22 @@ def get_order(order_id):
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/orders/<order_id>/cancel', methods=['POST'])
 def cancel_order(order_id):
     """Cancel an order"""
     try:
-        symbol = request.json.get('symbol', 'BTCUSDT')
+        symbol = (request.json or {}).get('symbol')
+        if not symbol:
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required field: symbol'
+            }), 400
         
-        if client:
-            response = client.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+        order_manager = get_order_manager()
+        if order_manager:
+            response = order_manager.cancel_order(symbol, int(order_id))
             return jsonify({
                 'status': 'success',
                 'message': 'Order cancelled successfully',
@@ -236,12 +445,237 @@ def cancel_order(order_id):
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
+
+@app.route('/api/orders/cancel-batch', methods=['POST'])
+def cancel_orders_batch():
+    """Cancel several orders on one symbol"""
+    try:
+        data = request.json or {}
+        for field in ['symbol', 'order_ids']:
+            if field not in data:
+                return jsonify({
+                    'status': 'error',
+                    'message': f'Missing required field: {field}'
+                }), 400
+        
+        order_manager = get_order_manager()
+        if order_manager:
+            results = order_manager.cancel_orders(data['symbol'], data['order_ids'])
+            return jsonify({
+                'status': 'success',
+                'message': f"{len(results)} cancel results",
+                'results': results
+            })
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+    except Exception as e:
+        logger.error(f"Failed to cancel orders: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
+
+@app.route('/api/orders/cancel-all', methods=['POST'])
+def cancel_all_orders():
+    """Cancel all open orders on the given symbols (default: every symbol)"""
+    try:
+        data = request.json or {}
+        symbols = data.get('symbols')
+        if data.get('symbol'):
+            symbols = [data['symbol']]
+        
+        order_manager = get_order_manager()
+        if order_manager:
+            results = order_manager.cancel_all_symbols(symbols)
+            return jsonify({
+                'status': 'success',
+                'message': f"Cancelled open orders on {len(results)} symbols",
+                'results': results
+            })
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+    except Exception as e:
+        logger.error(f"Failed to cancel all orders: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
+
+@app.route('/api/orders/auto-cancel', methods=['GET', 'POST'])
+def auto_cancel():
+    """Get or update the cancel-on-disconnect heartbeat"""
+    heartbeat = heartbeats.get(g.account)
+    if request.method == 'GET':
+        return jsonify({
+            'status': 'success',
+            'auto_cancel': heartbeat.status() if heartbeat else {'running': False, 'symbols': []}
+        })
+    
+    try:
+        data = request.json or {}
+        symbol = data.get('symbol')
+        if not symbol:
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required field: symbol'
+            }), 400
+        
+        order_manager = get_order_manager()
+        if order_manager is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+        
+        try:
+            countdown = float(data['countdown']) if 'countdown' in data else None
+            if heartbeat is None:
+                # Concurrent first requests must share one heartbeat thread
+                with heartbeats_lock:
+                    heartbeat = heartbeats.get(g.account)
+                    if heartbeat is None:
+                        heartbeat = AutoCancelHeartbeat(order_manager, countdown=60.0 if countdown is None else countdown)
+                        heartbeats[g.account] = heartbeat
+            if countdown is not None and countdown != heartbeat.countdown:
+                heartbeat.set_countdown(countdown)
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid countdown: {e}'
+            }), 400
+        
+        if data.get('enabled', True):
+            heartbeat.add_symbol(symbol)
+        else:
+            heartbeat.remove_symbol(symbol)
+        
+        return jsonify({
+            'status': 'success',
+            'message': 'Auto-cancel updated',
+            'auto_cancel': heartbeat.status()
+        })
+    except Exception as e:
+        logger.error(f"Failed to update auto-cancel: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
+
+def get_engine(create: bool = False):
+    """Execution engine for the current request's account"""
+    engine = engines.get(g.account)
+    if engine is not None or not create:
+        return engine
+    
+    # Concurrent first requests must not each start an event loop thread
+    with engines_lock:
+        engine = engines.get(g.account)
+        if engine is not None:
+            return engine
+        order_manager = get_order_manager()
+        if order_manager is None:
+            return None
+        engine = ExecutionEngine(order_manager)
+        engine.start()
+        engines[g.account] = engine
+    return engine
+
+@app.route('/api/algos', methods=['GET', 'POST'])
+def algos():
+    """List algo orders or start a new one (TWAP, ICEBERG, BRACKET)"""
+    if request.method == 'GET':
+        engine = get_engine()
+        return jsonify({
+            'status': 'success',
+            'algos': engine.status() if engine else []
+        })
+    
+    try:
+        data = request.json or {}
+        algo_type = str(data.get('type', '')).upper()
+        if algo_type not in ALGO_TYPES:
+            return jsonify({
+                'status': 'error',
+                'message': f"Invalid algo type. Must be one of {', '.join(ALGO_TYPES)}"
+            }), 400
+        
+        algo_class, required_fields = ALGO_TYPES[algo_type]
+        for field in required_fields:
+            if field not in data:
+                return jsonify({
+                    'status': 'error',
+                    'message': f'Missing required field: {field}'
+                }), 400
+        
+        params = {key: value for key, value in data.items() if key != 'type'}
+        algo = algo_class(**params)
+        
+        engine = get_engine(create=True)
+        if engine is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+        
+        algo_id = engine.submit(algo)
+        return jsonify({
+            'status': 'success',
+            'message': f'{algo_type} started',
+            'algo': engine.status(algo_id)
+        })
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Failed to start algo: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
+
+@app.route('/api/algos/<int:algo_id>', methods=['GET'])
+def get_algo(algo_id):
+    """Get progress of an algo order"""
+    engine = get_engine()
+    algo = engine.status(algo_id) if engine else None
+    if algo is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Algo {algo_id} not found'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'algo': algo
+    })
+
+@app.route('/api/algos/<int:algo_id>/cancel', methods=['POST'])
+def cancel_algo(algo_id):
+    """Cancel a running algo order"""
+    engine = get_engine()
+    if engine is None or not engine.cancel(algo_id):
+        return jsonify({
+            'status': 'error',
+            'message': f'Algo {algo_id} not found or already finished'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'message': f'Algo {algo_id} cancelling'
+    })
 
 @app.route('/api/account', methods=['GET'])
 def get_account():
     """Get account information"""
     try:
+        client = get_client()
         if client:
             account_info = client.get_account_info()
             
@@ -267,14 +701,85 @@ def get_account():
         return jsonify({
             'status': 'error',
             'message': str(e)
+        }), error_status(e)
+
+@app.route('/api/risk', methods=['GET'])
+def get_risk():
+    """Get risk limits, check latency and exposure for the account"""
+    return jsonify({
+        'status': 'success',
+        'metrics': pool.risk_engine.metrics(),
+        'exposure': pool.risk_engine.exposure(g.account)
+    })
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics_snapshot():
+    """Get realized/unrealized PnL, fees and funding by symbol and by day"""
+    analytics = get_analytics()
+    if analytics is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Client not initialized'
         }), 500
+    return jsonify({
+        'status': 'success',
+        'analytics': analytics.snapshot()
+    })
+
+@app.route('/api/analytics/rebuild', methods=['POST'])
+def rebuild_analytics():
+    """Rebuild analytics from the account's trade and funding history"""
+    try:
+        client = get_client()
+        analytics = get_analytics()
+        if not client or analytics is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+
+        data = request.get_json(silent=True) or {}
+        symbols = data.get('symbols')
+        if not symbols:
+            # userTrades is per symbol: use traded and currently held symbols
+            positions = client.client.futures_position_information()
+            symbols = set(analytics.symbols) | {
+                p['symbol'] for p in positions if float(p.get('positionAmt', 0)) != 0
+            }
+
+        trades = []
+        for symbol in sorted(symbols):
+            trades.extend(fetch_trades(client.client, symbol))
+        income = fetch_funding(client.client)
+        analytics.rebuild_from_history(trades, income)
+
+        return jsonify({
+            'status': 'success',
+            'message': f'Analytics rebuilt from {len(trades)} trades',
+            'analytics': analytics.snapshot()
+        })
+    except Exception as e:
+        logger.error(f"Failed to rebuild analytics: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
 
 @app.route('/api/market/tickers', methods=['GET'])
 def get_tickers():
     """Get market tickers"""
     try:
+        client = get_client()
         if client:
             tickers = client.client.futures_ticker()
+            
+            # Keep risk reference prices and PnL marks fresh from data we fetched anyway
+            analytics = get_analytics()
+            for ticker in tickers:
+                price = float(ticker['lastPrice'])
+                pool.risk_engine.update_mark_price(ticker['symbol'], price)
+                if analytics is not None:
+                    analytics.update_mark_price(ticker['symbol'], price)
             return jsonify({
                 'status': 'success',
                 'tickers': tickers
@@ -289,7 +794,7 @@ def get_tickers():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/market/depth', methods=['GET'])
 def get_depth():
@@ -298,8 +803,10 @@ def get_depth():
         symbol = request.args.get('symbol', 'BTCUSDT')
         limit = int(request.args.get('limit', 20))
         
+        client = get_client()
         if client:
             depth = client.client.futures_order_book(symbol=symbol, limit=limit)
+            record_ticks('record_book_top', symbol, depth)
             return jsonify({
                 'status': 'success',
                 'depth': depth
@@ -314,7 +821,7 @@ def get_depth():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/market/trades', methods=['GET'])
 def get_trades():
@@ -323,8 +830,10 @@ def get_trades():
         symbol = request.args.get('symbol', 'BTCUSDT')
         limit = int(request.args.get('limit', 50))
         
+        client = get_client()
         if client:
             trades = client.client.futures_recent_trades(symbol=symbol, limit=limit)
+            record_ticks('record_trades', symbol, trades)
             return jsonify({
                 'status': 'success',
                 'trades': trades
@@ -339,7 +848,104 @@ def get_trades():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
+
+@app.route('/api/market/mark-prices', methods=['GET'])
+def get_mark_prices():
+    """Get mark prices and funding rates"""
+    try:
+        client = get_client()
+        if client:
+            marks = client.client.futures_mark_price()
+            record_ticks('record_mark_prices', marks)
+            return jsonify({
+                'status': 'success',
+                'marks': marks
+            })
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': 'Client not initialized'
+            }), 500
+    except Exception as e:
+        logger.error(f"Failed to get mark prices: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
+
+@app.route('/api/market/ticks', methods=['GET'])
+def get_ticks():
+    """Replay recorded ticks for a symbol, stream and UTC day (YYYYMMDD)"""
+    symbol = request.args.get('symbol', 'BTCUSDT')
+    stream = request.args.get('stream', 'trades')
+    if stream not in STREAMS:
+        return jsonify({
+            'status': 'error',
+            'message': f'stream must be one of {", ".join(STREAMS)}'
+        }), 400
+    # Both end up in a file path: only the symbol format is checked, since
+    # recorded history may include symbols no longer listed
+    if not OrderValidator.validate_symbol(symbol):
+        return jsonify({
+            'status': 'error',
+            'message': f'Invalid symbol: {symbol}'
+        }), 400
+    day = request.args.get('day')
+    if day is not None and not DAY_PATTERN.fullmatch(day):
+        return jsonify({
+            'status': 'error',
+            'message': 'day must be a UTC date as YYYYMMDD'
+        }), 400
+    try:
+        limit = int(request.args.get('limit', 1000))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return jsonify({
+            'status': 'error',
+            'message': 'limit must be a positive integer'
+        }), 400
+    limit = min(limit, MAX_TICKS)
+
+    reader = TickReader(TICK_DIR)
+    days = reader.days(symbol, stream)
+    day = day or (days[-1] if days else None)
+    if day is None:
+        return jsonify({
+            'status': 'success',
+            'days': [],
+            'ticks': []
+        })
+
+    try:
+        if recorder is not None:
+            recorder.flush()
+        start = request.args.get('start', type=int)
+        end = request.args.get('end', type=int)
+        ticks = reader.read(symbol, stream, day, start, end)[-limit:]
+        columns = STREAMS[stream][1]
+        rows = []
+        for tick in ticks:
+            timestamp, *values = tuple(tick)
+            rows.append(dict(zip(columns, map(float, values)), time=int(timestamp)))
+        return jsonify({
+            'status': 'success',
+            'days': days,
+            'day': day,
+            'ticks': rows
+        })
+    except FileNotFoundError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+    except Exception as e:
+        logger.error(f"Failed to read ticks: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), error_status(e)
 
 @app.route('/api/market/klines', methods=['GET'])
 def get_klines():
@@ -349,6 +955,7 @@ def get_klines():
         interval = request.args.get('interval', '1h')
         limit = int(request.args.get('limit', 100))
         
+        client = get_client()
         if client:
             klines = client.client.futures_klines(
                 symbol=symbol,
@@ -369,38 +976,56 @@ def get_klines():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.route('/api/config', methods=['GET', 'POST'])
 def config():
-    """Get or update configuration"""
+    """Get the account's configuration (credentials masked) or rotate its API keys"""
     if request.method == 'GET':
+        api_key, api_secret = pool.credentials(g.account) or ('', '')
         return jsonify({
             'status': 'success',
             'config': {
-                'api_key': os.getenv('BINANCE_API_KEY', ''),
-                'api_secret': os.getenv('BINANCE_API_SECRET', ''),
+                'account': g.account,
+                'api_key': mask(api_key),
+                'api_secret': mask(api_secret),
+                'configured': bool(api_key and api_secret),
+                'vault': pool.vault.path if pool.vault else None,
+                'encrypted': bool(pool.vault and pool.vault.encrypted),
                 'testnet': True
             }
         })
     else:
-        # POST - Update configuration
-        data = request.json
-        
-        # In production, you would save these securely
-        # For this example, we'll just update environment variables
-        if 'api_key' in data:
-            os.environ['BINANCE_API_KEY'] = data['api_key']
-        if 'api_secret' in data:
-            os.environ['BINANCE_API_SECRET'] = data['api_secret']
+        # POST - Rotate credentials in place; omitted fields keep their current value
+        data = request.json or {}
+        current_key, current_secret = pool.credentials(g.account) or (None, None)
+        api_key = data.get('api_key') or current_key
+        api_secret = data.get('api_secret') or current_secret
+        # A form echoing the masked GET values back changes nothing
+        if current_key and api_key == mask(current_key):
+            api_key = current_key
+        if current_secret and api_secret == mask(current_secret):
+            api_secret = current_secret
+        if not api_key or not api_secret:
+            return jsonify({
+                'status': 'error',
+                'message': 'api_key and api_secret are required'
+            }), 400
         
-        # Reinitialize client with new credentials
-        initialize_client()
+        try:
+            pool.set_credentials(g.account, api_key, api_secret)
+        except Exception as e:
+            logger.error(f"Failed to update credentials for {g.account}: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), error_status(e)
         
         return jsonify({
             'status': 'success',
             'message': 'Configuration updated'
         })
+
 @app.route('/api/test-connection', methods=['GET'])
 def alias_test_connection():
     return test_connection()  # call the POST /api/connect function
@@ -450,7 +1075,7 @@ def get_logs():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }), error_status(e)
 
 @app.errorhandler(404)
 def not_found(error):
@@ -472,12 +1097,16 @@ if __name__ == '__main__':
     os.makedirs('logs', exist_ok=True)
     os.makedirs('frontend', exist_ok=True)
     
+    # Each shard (WORKER_ID of WORKER_COUNT) listens on its own port
+    port = int(os.getenv('PORT', 5000))
+    
     print("=" * 60)
     print("Trading Bot API Server")
     print("=" * 60)
-    print(f"Frontend: http://localhost:5000")
-    print(f"API Base: http://localhost:5000/api")
-    print(f"Health Check: http://localhost:5000/api/health")
+    print(f"Frontend: http://localhost:{port}")
+    print(f"API Base: http://localhost:{port}/api")
+    print(f"Health Check: http://localhost:{port}/api/health")
+    print(f"Shard: {pool.shard + 1} of {pool.ring.shards}")
     print("=" * 60)
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
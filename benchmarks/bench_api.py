@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+from .common import percentile
+from .stub_exchange import start_stub
+
+NAME = 'api'
+
+ENDPOINTS = {
+    'health': ('GET', '/api/health', None),
+    'orders': ('GET', '/api/orders?symbol=BTCUSDT&limit=50', None),
+    'tickers': ('GET', '/api/market/tickers', None),
+    'place_order': ('POST', '/api/place-order',
+                    {'symbol': 'BTCUSDT', 'side': 'BUY', 'order_type': 'MARKET', 'quantity': 0.001}),
+}
+
+
+def load_api_server(stub_url: str):
+    """Import api_server wired to the stub exchange"""
+    os.environ['BINANCE_API_KEY'] = 'bench-key'
+    os.environ['BINANCE_API_SECRET'] = 'bench-secret'
+    os.environ['BINANCE_FUTURES_URL'] = stub_url
+    # The stub has no weight limits; the client-side limiters would
+    # otherwise throttle the run and dominate the latencies
+    os.environ['BINANCE_WEIGHT_LIMIT'] = '1e9'
+    os.environ['BINANCE_IP_WEIGHT_LIMIT'] = '1e9'
+    import api_server
+    return api_server
+
+
+def hammer(base_url: str, method: str, path: str, body, requests_total: int, concurrency: int):
+    """Send ``requests_total`` requests from ``concurrency`` threads; return latencies and elapsed"""
+    local = threading.local()
+
+    def call(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        response = session.request(method, base_url + path, json=body)
+        elapsed = time.perf_counter() - started
+        return elapsed, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(call, range(requests_total)))
+    return samples, time.perf_counter() - started
+
+
+def run(quick: bool = False) -> dict:
+    requests_total = 200 if quick else 2000
+    concurrency = 16
+
+    stub, stub_url = start_stub()
+    api_server = load_api_server(stub_url)
+    server = make_server('127.0.0.1', 0, api_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = {}
+    try:
+        for name, (method, path, body) in ENDPOINTS.items():
+            samples, elapsed = hammer(base_url, method, path, body, requests_total, concurrency)
+            latencies = [latency for latency, _ in samples]
+            results[f'{name}_rps'] = requests_total / elapsed
+            results[f'{name}_p50_ms'] = percentile(latencies, 0.50) * 1000
+            results[f'{name}_p99_ms'] = percentile(latencies, 0.99) * 1000
+            results[f'{name}_errors'] = sum(1 for _, status in samples if status >= 400)
+    finally:
+        server.shutdown()
+        stub.shutdown()
+    return results
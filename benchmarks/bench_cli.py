@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+from .common import ROOT, summarize, time_calls
+
+NAME = 'cli'
+
+
+def run(quick: bool = False) -> dict:
+    """Wall time of ``cli.py --help`` in a fresh interpreter"""
+    iterations = 3 if quick else 10
+    env = dict(os.environ, BINANCE_API_KEY='', BINANCE_API_SECRET='')
+    command = [sys.executable, str(ROOT / 'cli.py'), '--help']
+
+    def start():
+        subprocess.run(command, env=env, capture_output=True, check=True)
+
+    samples = time_calls(start, iterations)
+    results = summarize('startup', samples)
+    # Startup is milliseconds, not microseconds
+    return {key.replace('_us', '_ms'): value / 1000 for key, value in results.items()}
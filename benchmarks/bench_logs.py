@@ -0,0 +1,41 @@
+import os
+import time
+from pathlib import Path
+
+from .bench_api import load_api_server
+from .common import summarize, time_calls
+
+NAME = 'logs'
+
+LINE = ('2026-01-30 10:21:22,123 - bot.orders - INFO - Order placed successfully: '
+        "{'orderId': 4061372, 'symbol': 'BTCUSDT', 'status': 'NEW', 'price': '50000'}\n")
+
+
+def write_log(path: Path, lines: int):
+    chunk = LINE * 1000
+    with open(path, 'w') as f:
+        for _ in range(lines // 1000):
+            f.write(chunk)
+    # Newest file wins, even over the log the server itself is writing
+    future = time.time() + 3600
+    os.utime(path, (future, future))
+
+
+def run(quick: bool = False) -> dict:
+    """/api/logs latency for a large latest log file (relative to the working directory)"""
+    lines = 100_000 if quick else 1_000_000
+    iterations = 5 if quick else 20
+
+    # /api/logs never reaches the exchange, so no stub is needed
+    api_server = load_api_server('http://127.0.0.1:9')
+    client = api_server.app.test_client()
+
+    log_path = Path('logs') / 'trading_bot_99991231_235959.log'
+    log_path.parent.mkdir(exist_ok=True)
+    write_log(log_path, lines)
+    try:
+        results = summarize('logs_endpoint', time_calls(lambda: client.get('/api/logs'), iterations))
+        results['log_file_mb'] = log_path.stat().st_size / 1e6
+    finally:
+        log_path.unlink()
+    return results
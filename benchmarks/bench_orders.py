@@ -0,0 +1,62 @@
+import time
+
+from bot.client import BinanceFuturesClient
+from bot.orders import OrderManager
+from bot.risk import RiskEngine, RiskLimits
+from bot.validators import OrderValidator
+
+from .common import summarize, time_calls
+from .stub_exchange import start_stub
+
+NAME = 'orders'
+
+
+def run(quick: bool = False) -> dict:
+    """
+    OrderManager.place_order latency, end to end and by stage
+
+    The exchange round trip is what remains of the end-to-end LIMIT median
+    once the in-process stages (which validate a LIMIT order) are taken out.
+    """
+    iterations = 200 if quick else 2000
+    server, url = start_stub()
+    try:
+        client = BinanceFuturesClient('bench-key', 'bench-secret', futures_url=url,
+                                      time_sync_interval=0)
+        order_manager = OrderManager(client)
+        risk = RiskEngine(RiskLimits(max_order_notional=1e9, max_position_qty=1e9, price_band_pct=10))
+        risk.update_mark_price('BTCUSDT', 50000.0)
+        symbol_info = client.get_symbol_info('BTCUSDT')
+        params = {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': 0.01,
+                  'price': 50000.0, 'timeInForce': 'GTC', 'newClientOrderId': 'tb-bench',
+                  'timestamp': int(time.time() * 1000)}
+
+        stages = {
+            'validate': lambda: (OrderValidator.validate_symbol('BTCUSDT', client.tradable_symbols())
+                                 and OrderValidator.validate_side('BUY')
+                                 and OrderValidator.validate_order_type('LIMIT')),
+            'symbol_info': lambda: client.get_symbol_info('BTCUSDT'),
+            'filters': lambda: (OrderValidator.validate_quantity(0.01, symbol_info)
+                                and OrderValidator.validate_price(50000.0, 'LIMIT', symbol_info)),
+            'risk': lambda: risk.check('bench', 'BTCUSDT', 'BUY', 0.01, 50000.0),
+            'sign': lambda: client.client._generate_signature(dict(params)),
+        }
+
+        results = {}
+        in_process_p50 = 0.0
+        for name, function in stages.items():
+            stage = summarize(name, time_calls(function, iterations * 10))
+            in_process_p50 += stage[f'{name}_p50_us']
+            results.update(stage)
+
+        results.update(summarize('place_order', time_calls(
+            lambda: order_manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01),
+            iterations)))
+        total = summarize('place_limit_order', time_calls(
+            lambda: order_manager.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, price=50000.0),
+            iterations))
+        results.update(total)
+        results['exchange_roundtrip_p50_us'] = max(0.0, total['place_limit_order_p50_us'] - in_process_p50)
+        return results
+    finally:
+        server.shutdown()
@@ -0,0 +1,41 @@
+import time
+from pathlib import Path
+
+from bot.recorder import TickReader, TickRecorder
+
+NAME = 'recorder'
+
+
+def run(quick: bool = False) -> dict:
+    """TickRecorder write throughput (batched and single) and read-back rate"""
+    events = 200_000 if quick else 2_000_000
+    batch = 10_000
+    root = Path('ticks-bench')
+    start_ms = 1_767_225_600_000  # 2026-01-01, one tick per millisecond
+    rows = [(start_ms + i, 50000.0 + i % 100, 0.01, 1.0, float(i)) for i in range(events)]
+
+    recorder = TickRecorder(str(root))
+    started = time.perf_counter()
+    for i in range(0, events, batch):
+        recorder.record_many('trades', 'BTCUSDT', rows[i:i + batch])
+    recorder.flush()
+    batched = events / (time.perf_counter() - started)
+
+    single = events // 10
+    started = time.perf_counter()
+    for row in rows[:single]:
+        recorder.record('book', 'BTCUSDT', *row)
+    recorder.flush()
+    single_rate = single / (time.perf_counter() - started)
+    recorder.stop()
+
+    reader = TickReader(str(root))
+    started = time.perf_counter()
+    ticks = reader.read('BTCUSDT', 'trades', '20260101')
+    read_rate = len(ticks) / (time.perf_counter() - started)
+
+    return {
+        'record_many_events_per_s': batched,
+        'record_events_per_s': single_rate,
+        'read_events_per_s': read_rate,
+    }
@@ -0,0 +1,22 @@
+from bot.validators import OrderValidator
+
+from .common import throughput
+from .stub_exchange import SYMBOLS, symbol_info
+
+NAME = 'validator'
+
+
+def run(quick: bool = False) -> dict:
+    iterations = 20000 if quick else 200000
+    info = symbol_info('BTCUSDT', SYMBOLS['BTCUSDT'])
+    listed = frozenset(SYMBOLS)
+
+    return {
+        'validate_symbol_per_s': throughput(lambda: OrderValidator.validate_symbol('BTCUSDT'), iterations),
+        'validate_symbol_listed_per_s': throughput(
+            lambda: OrderValidator.validate_symbol('BTCUSDT', listed), iterations),
+        'validate_side_per_s': throughput(lambda: OrderValidator.validate_side('BUY'), iterations),
+        'validate_quantity_per_s': throughput(lambda: OrderValidator.validate_quantity(0.01, info), iterations),
+        'validate_price_per_s': throughput(
+            lambda: OrderValidator.validate_price(50000.0, 'LIMIT', info), iterations),
+    }
@@ -0,0 +1,93 @@
+import json
+import math
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Metrics with these suffixes improve when they go up; all others when they go down
+HIGHER_IS_BETTER = ('_per_s', '_rps')
+
+
+def percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def summarize(name: str, samples_s: list) -> dict:
+    """p50/p99/mean of latency samples (seconds) as ``<name>_<stat>_us``"""
+    return {
+        f'{name}_p50_us': percentile(samples_s, 0.50) * 1e6,
+        f'{name}_p99_us': percentile(samples_s, 0.99) * 1e6,
+        f'{name}_mean_us': sum(samples_s) / len(samples_s) * 1e6,
+    }
+
+
+def time_calls(function, iterations: int) -> list:
+    """Latency of each of ``iterations`` calls in seconds"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def throughput(function, iterations: int) -> float:
+    """Calls per second over a tight loop"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return iterations / (time.perf_counter() - started)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def save_results(results: dict, path: Path) -> Path:
+    payload = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare results against a baseline run
+
+    Returns:
+        list: (benchmark, metric, baseline, current, change %) for every
+            metric that got worse by more than ``threshold`` percent (a
+            move away from a zero baseline counts as an infinite change)
+    """
+    regressions = []
+    for bench, metrics in baseline.get('results', {}).items():
+        for metric, old in metrics.items():
+            new = results.get(bench, {}).get(metric)
+            if new is None:
+                continue
+            if old == 0:
+                if new == 0:
+                    continue
+                change = math.copysign(math.inf, new)
+            else:
+                change = (new - old) / abs(old) * 100
+            worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+            if worse > threshold:
+                regressions.append((bench, metric, old, new, change))
+    return regressions
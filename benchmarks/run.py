@@ -0,0 +1,70 @@
+"""
+Run the offline benchmark suite against a local stub exchange
+
+    python -m benchmarks.run                        # full run, saved under benchmarks/results/
+    python -m benchmarks.run --quick --only orders
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json --threshold 20
+
+With --baseline the exit status is 1 if any metric regressed by more than
+--threshold percent.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import (bench_api, bench_cli, bench_logs, bench_orders,  # noqa: E402
+                        bench_recorder, bench_validator)
+from benchmarks.common import compare, save_results  # noqa: E402
+
+BENCHMARKS = {module.NAME: module for module in
+              (bench_validator, bench_orders, bench_api, bench_logs, bench_cli, bench_recorder)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trading bot benchmark suite')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help='Run only this benchmark (repeatable)')
+    parser.add_argument('--quick', action='store_true', help='Fewer iterations, for smoke runs')
+    parser.add_argument('--output', type=Path, help='Results file (default: benchmarks/results/<time>.json)')
+    parser.add_argument('--baseline', type=Path, help='Results file to compare against')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='Allowed regression in percent (default: 20)')
+    args = parser.parse_args()
+
+    output = (args.output or ROOT / 'benchmarks' / 'results'
+              / f"{time.strftime('%Y%m%d_%H%M%S')}.json").resolve()
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+
+    # The bot logs every request and writes logs/ into the working directory
+    os.chdir(tempfile.mkdtemp(prefix='trading-bot-bench-'))
+    logging.disable(logging.CRITICAL)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", flush=True)
+        results[name] = BENCHMARKS[name].run(quick=args.quick)
+        for metric, value in results[name].items():
+            print(f"  {metric:32} {value:14.2f}")
+
+    print(f"\nResults saved to {save_results(results, output)}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold}%:")
+            for bench, metric, old, new, change in regressions:
+                print(f"  {bench}.{metric}: {old:.2f} -> {new:.2f} ({change:+.1f}%)")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold}% against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+"""
+Local stub of the Binance USD-M futures REST API
+
+Serves just enough of /fapi for the bot and benchmarks to run offline:
+market data, exchange info, account/positions, trade history and order
+(and conditional algo order) entry, query and cancel. MARKET orders fill
+at once but, as on Binance, the default ACK response reports them NEW.
+Faults can be injected to exercise retries and idempotency:
+
+    python -m benchmarks.stub_exchange --port 8900 --error-rate 0.05 --drop-rate 0.05
+
+Point the bot at it with BINANCE_FUTURES_URL=http://127.0.0.1:8900.
+"""
+import argparse
+import itertools
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+SYMBOLS = {
+    'BTCUSDT': {'price': 50000.0, 'tick': '0.10', 'step': '0.001'},
+    'ETHUSDT': {'price': 3000.0, 'tick': '0.01', 'step': '0.001'},
+    'SOLUSDT': {'price': 150.0, 'tick': '0.0100', 'step': '1'},
+    '1000PEPEUSDT': {'price': 0.01, 'tick': '0.0000001', 'step': '1'},
+}
+
+
+def symbol_info(symbol: str, spec: dict) -> dict:
+    base = symbol[:-4]
+    return {
+        'symbol': symbol,
+        'status': 'TRADING',
+        'contractType': 'PERPETUAL',
+        'baseAsset': base,
+        'quoteAsset': 'USDT',
+        'filters': [
+            {'filterType': 'PRICE_FILTER', 'minPrice': spec['tick'], 'maxPrice': '1000000',
+             'tickSize': spec['tick']},
+            {'filterType': 'LOT_SIZE', 'minQty': spec['step'], 'maxQty': '100000',
+             'stepSize': spec['step']},
+        ]
+    }
+
+
+class StubExchange:
+    """In-memory order book state and fault settings shared by request handlers"""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, drop_rate: float = 0.0):
+        """
+        Args:
+            latency: Seconds added to every response
+            error_rate: Fraction of order requests answered with 503 / -1001
+            drop_rate: Fraction of order requests accepted but never answered
+                (the connection is closed, as on a timeout)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.orders = {}
+        self.by_client_id = {}
+        self.algo_orders = {}
+        self.by_client_algo_id = {}
+        self.countdowns = {}
+        # Income history rows (e.g. FUNDING_FEE) served by /income, oldest first
+        self.income = []
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def fault(self) -> str:
+        roll = random.random()
+        if roll < self.drop_rate:
+            return 'drop'
+        if roll < self.drop_rate + self.error_rate:
+            return 'error'
+        return None
+
+    def new_order(self, params: dict):
+        symbol = params.get('symbol')
+        if symbol not in SYMBOLS:
+            return 400, {'code': -1121, 'msg': 'Invalid symbol.'}
+
+        client_id = params.get('newClientOrderId') or f"stub-{time.time_ns()}"
+        with self._lock:
+            # Like Binance, a client id can be reused once its order is done
+            existing = self.by_client_id.get(client_id)
+            if existing is not None and existing['status'] == 'NEW':
+                return 400, {'code': -4116, 'msg': 'ClientOrderId is duplicated.'}
+
+            quantity = params.get('quantity', '0')
+            market = params.get('type') == 'MARKET'
+            price = SYMBOLS[symbol]['price']
+            order = {
+                'orderId': next(self._ids),
+                'symbol': symbol,
+                'status': 'FILLED' if market else 'NEW',
+                'clientOrderId': client_id,
+                'price': params.get('price', '0'),
+                'avgPrice': str(price) if market else '0',
+                'origQty': quantity,
+                'executedQty': quantity if market else '0',
+                'cumQuote': str(float(quantity) * price) if market else '0',
+                'timeInForce': params.get('timeInForce', 'GTC'),
+                'type': params.get('type'),
+                'reduceOnly': params.get('reduceOnly') == 'true',
+                'side': params.get('side'),
+                'stopPrice': params.get('stopPrice', '0'),
+                'updateTime': int(time.time() * 1000)
+            }
+            self.orders[order['orderId']] = order
+            self.by_client_id[client_id] = order
+        if params.get('newOrderRespType', 'ACK') == 'ACK':
+            # Like Binance, an ACK response only confirms acceptance: the
+            # fill shows up in later queries (or with newOrderRespType=RESULT)
+            return 200, dict(order, status='NEW', avgPrice='0.00', executedQty='0', cumQuote='0')
+        return 200, dict(order)
+
+    def new_algo_order(self, params: dict):
+        symbol = params.get('symbol')
+        if symbol not in SYMBOLS:
+            return 400, {'code': -1121, 'msg': 'Invalid symbol.'}
+
+        client_id = params.get('clientAlgoId') or f"stub-{time.time_ns()}"
+        with self._lock:
+            if client_id in self.by_client_algo_id:
+                return 400, {'code': -4116, 'msg': 'ClientOrderId is duplicated.'}
+            order = {
+                'algoId': next(self._ids),
+                'clientAlgoId': client_id,
+                'algoType': params.get('algoType', 'CONDITIONAL'),
+                'orderType': params.get('type'),
+                'symbol': symbol,
+                'side': params.get('side'),
+                'quantity': params.get('quantity', '0'),
+                'triggerPrice': params.get('triggerPrice', '0'),
+                'reduceOnly': params.get('reduceOnly') == 'true',
+                'algoStatus': 'NEW',
+                'updateTime': int(time.time() * 1000)
+            }
+            self.algo_orders[order['algoId']] = order
+            self.by_client_algo_id[client_id] = order
+        return 200, order
+
+    def find_algo_order(self, params: dict):
+        with self._lock:
+            if 'algoId' in params:
+                return self.algo_orders.get(int(params['algoId']))
+            return self.by_client_algo_id.get(params.get('clientAlgoId'))
+
+    def find_order(self, params: dict):
+        with self._lock:
+            if 'orderId' in params:
+                return self.orders.get(int(params['orderId']))
+            return self.by_client_id.get(params.get('origClientOrderId'))
+
+    def cancel(self, order: dict) -> dict:
+        with self._lock:
+            if order['status'] == 'NEW':
+                order['status'] = 'CANCELED'
+                order['updateTime'] = int(time.time() * 1000)
+            return dict(order)
+
+    def open_orders(self, symbol: str = None) -> list:
+        with self._lock:
+            return [dict(order) for order in self.orders.values()
+                    if order['status'] == 'NEW' and symbol in (None, order['symbol'])]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    @property
+    def exchange(self) -> StubExchange:
+        return self.server.exchange
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self) -> dict:
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode('utf-8')))
+        return params
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-MBX-USED-WEIGHT-1M', str(self.exchange.requests % 2400))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _drop(self):
+        # Accept-then-vanish: the client only sees a dropped connection
+        self.close_connection = True
+        self.connection.shutdown(socket.SHUT_RDWR)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str):
+        self.exchange.requests += 1
+        params = self._params()
+        # /fapi/v1/order -> order
+        path = urlparse(self.path).path.split('/', 3)[-1]
+
+        if self.exchange.latency:
+            time.sleep(self.exchange.latency)
+
+        try:
+            status, payload = self._route(method, path, params)
+        except _Dropped:
+            self._drop()
+            return
+        self._send(status, payload)
+
+    def _route(self, method: str, path: str, params: dict):
+        exchange = self.exchange
+
+        if path in ('ping', 'api/v3/ping'):
+            return 200, {}
+        if path == 'time':
+            return 200, {'serverTime': int(time.time() * 1000)}
+        if path == 'exchangeInfo':
+            return 200, {
+                'timezone': 'UTC',
+                'serverTime': int(time.time() * 1000),
+                'symbols': [symbol_info(symbol, spec) for symbol, spec in SYMBOLS.items()]
+            }
+        if path == 'ticker/24hr':
+            tickers = [{'symbol': symbol, 'lastPrice': str(spec['price']), 'volume': '1000'}
+                       for symbol, spec in SYMBOLS.items()]
+            if 'symbol' in params:
+                return 200, next(t for t in tickers if t['symbol'] == params['symbol'])
+            return 200, tickers
+        if path == 'premiumIndex':
+            return 200, [{'symbol': symbol, 'markPrice': str(spec['price'])}
+                         for symbol, spec in SYMBOLS.items()]
+        if path == 'depth':
+            price = SYMBOLS.get(params.get('symbol'), SYMBOLS['BTCUSDT'])['price']
+            limit = int(params.get('limit', 20))
+            return 200, {
+                'lastUpdateId': exchange.requests,
+                'bids': [[str(price - i), '1.000'] for i in range(1, limit + 1)],
+                'asks': [[str(price + i), '1.000'] for i in range(1, limit + 1)]
+            }
+        if path == 'trades':
+            price = SYMBOLS.get(params.get('symbol'), SYMBOLS['BTCUSDT'])['price']
+            now = int(time.time() * 1000)
+            limit = int(params.get('limit', 50))
+            return 200, [{'id': now - limit + i, 'price': str(price), 'qty': '0.010',
+                          'time': now - limit + i, 'isBuyerMaker': bool(i % 2)} for i in range(limit)]
+        if path == 'klines':
+            price = SYMBOLS.get(params.get('symbol'), SYMBOLS['BTCUSDT'])['price']
+            now = int(time.time() * 1000)
+            return 200, [[now - i * 60000, str(price), str(price), str(price), str(price), '1.0']
+                         for i in range(int(params.get('limit', 100)))]
+        if path == 'account':
+            return 200, {'accountType': 'STUB', 'totalWalletBalance': '10000.0',
+                         'availableBalance': '10000.0', 'assets': [], 'positions': []}
+        if path == 'positionRisk':
+            return 200, [{'symbol': symbol, 'positionAmt': '0', 'markPrice': str(spec['price']),
+                          'entryPrice': '0', 'unRealizedProfit': '0'} for symbol, spec in SYMBOLS.items()]
+        if path == 'openOrders':
+            return 200, exchange.open_orders(params.get('symbol'))
+        if path == 'allOrders':
+            orders = [dict(order) for order in exchange.orders.values()
+                      if params.get('symbol') in (None, order['symbol'])]
+            return 200, orders[-int(params.get('limit', 500)):]
+        if path == 'userTrades':
+            from_id = int(params.get('fromId', 0))
+            # Like Binance, a time query covers at most seven days
+            start_time = int(params.get('startTime', 0))
+            end_time = int(params.get('endTime', start_time + 7 * 24 * 3600 * 1000
+                                      if 'startTime' in params else time.time() * 1000))
+            trades = [{'symbol': order['symbol'], 'id': order['orderId'], 'orderId': order['orderId'],
+                       'side': order['side'], 'price': order['avgPrice'], 'qty': order['executedQty'],
+                       'commission': str(float(order['cumQuote']) * 0.0004), 'commissionAsset': 'USDT',
+                       'realizedPnl': '0', 'time': order['updateTime']}
+                      for order in list(exchange.orders.values())
+                      if order['symbol'] == params.get('symbol') and float(order['executedQty'])
+                      and order['orderId'] >= from_id
+                      and start_time <= order['updateTime'] <= end_time]
+            return 200, trades[:min(int(params.get('limit', 500)), 1000)]
+        if path == 'income':
+            rows = [row for row in list(exchange.income)
+                    if row['time'] >= int(params.get('startTime', 0))
+                    and params.get('incomeType') in (None, row['incomeType'])]
+            return 200, rows[:min(int(params.get('limit', 100)), 1000)]
+        if path in ('openAlgoOrders', 'allAlgoOrders'):
+            return 200, []
+        if path == 'countdownCancelAll':
+            exchange.countdowns[params.get('symbol')] = int(params.get('countdownTime', 0))
+            return 200, {'symbol': params.get('symbol'), 'countdownTime': params.get('countdownTime')}
+        if path == 'allOpenOrders' and method == 'DELETE':
+            for order in exchange.open_orders(params.get('symbol')):
+                exchange.cancel(exchange.orders[order['orderId']])
+            return 200, {'code': 200, 'msg': 'The operation of cancel all open order is done.'}
+        if path == 'batchOrders' and method == 'DELETE':
+            ids = json.loads(params.get('orderidlist') or params.get('orderIdList') or '[]')
+            results = []
+            for order_id in ids:
+                order = exchange.orders.get(int(order_id))
+                results.append(exchange.cancel(order) if order
+                               else {'code': -2011, 'msg': 'Unknown order sent.'})
+            return 200, results
+        if path == 'order':
+            return self._order(method, params)
+        if path == 'algoOrder':
+            return self._algo_order(method, params)
+
+        return 404, {'code': -1000, 'msg': f'Stub does not implement {method} {path}'}
+
+    def _order(self, method: str, params: dict):
+        exchange = self.exchange
+
+        if method == 'POST':
+            fault = exchange.fault()
+            if fault == 'error':
+                return 503, {'code': -1001, 'msg': 'Internal error; unable to process your request.'}
+            status, payload = exchange.new_order(params)
+            if fault == 'drop':
+                raise _Dropped()
+            return status, payload
+
+        order = exchange.find_order(params)
+        if order is None:
+            return 400, {'code': -2013, 'msg': 'Order does not exist.'}
+        if method == 'DELETE':
+            return 200, exchange.cancel(order)
+        return 200, dict(order)
+
+
+    def _algo_order(self, method: str, params: dict):
+        exchange = self.exchange
+
+        if method == 'POST':
+            fault = exchange.fault()
+            if fault == 'error':
+                return 503, {'code': -1001, 'msg': 'Internal error; unable to process your request.'}
+            status, payload = exchange.new_algo_order(params)
+            if fault == 'drop':
+                raise _Dropped()
+            return status, payload
+
+        order = exchange.find_algo_order(params)
+        if order is None:
+            return 400, {'code': -2013, 'msg': 'Order does not exist.'}
+        if method == 'DELETE':
+            with exchange._lock:
+                if order['algoStatus'] == 'NEW':
+                    order['algoStatus'] = 'CANCELED'
+            return 200, dict(order)
+        return 200, dict(order)
+
+
+class _Dropped(Exception):
+    pass
+
+
+def start_stub(port: int = 0, **faults):
+    """
+    Start a stub exchange in a daemon thread
+
+    Returns:
+        tuple: (server, base URL); call server.shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.exchange = StubExchange(**faults)
+    threading.Thread(target=server.serve_forever, name='stub-exchange', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of orders answered 503')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of orders accepted without a response')
+    args = parser.parse_args()
+
+    server, url = start_stub(args.port, latency=args.latency,
+                             error_rate=args.error_rate, drop_rate=args.drop_rate)
+    print(f"Stub exchange listening on {url} (BINANCE_FUTURES_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
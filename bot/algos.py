@@ -0,0 +1,741 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_DOWN
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'PENDING'
+RUNNING = 'RUNNING'
+COMPLETED = 'COMPLETED'
+CANCELLED = 'CANCELLED'
+FAILED = 'FAILED'
+
+# Order / algo-order statuses meaning the order will not fill any further
+FINAL_STATUSES = {'FILLED', 'CANCELED', 'EXPIRED', 'REJECTED', 'FINISHED'}
+
+# Statuses meaning a bracket exit leg has fired
+TRIGGERED_STATUSES = {'FILLED', 'TRIGGERED', 'FINISHED'}
+
+
+class WallClock:
+    """Real time"""
+
+    def time(self) -> float:
+        return time.time()
+
+
+class SimulatedClock:
+    """Manually advanced clock for running algos in fast-forward"""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def time(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        self._now += seconds
+
+
+class _Timer:
+    __slots__ = ('deadline', 'callback', 'cancelled')
+
+    def __init__(self, deadline: int, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel
+
+    Timers are bucketed by tick into ``size`` slots, so scheduling and
+    firing are O(1) regardless of how many algos are running. Timers more
+    than one revolution away simply stay in their slot until due.
+    """
+
+    def __init__(self, tick: float = 0.1, size: int = 512, start: float = 0.0):
+        self.tick = tick
+        self.size = size
+        self._slots = [[] for _ in range(size)]
+        self._current = int(start // tick)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def current_tick(self) -> int:
+        return self._current
+
+    def schedule(self, when: float, callback) -> _Timer:
+        """Fire ``callback()`` on the first advance past ``when``"""
+        deadline = max(int(when // self.tick), self._current)
+        timer = _Timer(deadline, callback)
+        self._slots[deadline % self.size].append(timer)
+        self._count += 1
+        return timer
+
+    def advance(self, now: float):
+        """Fire every timer due at or before ``now``"""
+        target = int(now // self.tick)
+        while self._current <= target:
+            if not self._count:
+                # Nothing scheduled, jump straight to the target tick
+                self._current = target + 1
+                return
+
+            slot = self._slots[self._current % self.size]
+            due = [timer for timer in slot if timer.deadline <= self._current]
+            if due:
+                slot[:] = [timer for timer in slot if timer.deadline > self._current]
+                self._count -= len(due)
+            self._current += 1
+
+            for timer in due:
+                if not timer.cancelled:
+                    timer.callback()
+
+
+def round_step(quantity: float, step_size: float) -> float:
+    """Round a quantity down to the symbol's step size"""
+    step = Decimal(str(step_size))
+    return float((Decimal(str(quantity)) / step).to_integral_value(ROUND_DOWN) * step)
+
+
+def lot_step(symbol_info: dict) -> float:
+    """Step size from a symbol's LOT_SIZE filter"""
+    for filter_info in symbol_info.get('filters', []):
+        if filter_info['filterType'] == 'LOT_SIZE':
+            return float(filter_info['stepSize'])
+    return 0.0
+
+
+def order_ref(response: dict) -> dict:
+    """Identify an order (or conditional algo order) for status/cancel calls"""
+    if response.get('algoId') is not None:
+        return {'algoId': response['algoId']}
+    return {'orderId': response['orderId']}
+
+
+def query_order(engine, symbol: str, ref: dict):
+    """Blocking status call for an order reference, recording fills when possible"""
+    if 'orderId' in ref:
+        return partial(engine.order_manager.get_order_status, symbol, ref['orderId'])
+    return partial(engine.order_manager.client.client.futures_get_order, symbol=symbol, **ref)
+
+
+def order_status(response: dict) -> str:
+    return response.get('status') or response.get('algoStatus') or ''
+
+
+class Algo:
+    """Base class for parent orders executed as a series of child orders"""
+
+    kind = 'ALGO'
+
+    def __init__(self, symbol: str, side: str, quantity: float):
+        if not quantity > 0:
+            raise ValueError(f"Quantity must be positive, got {quantity}")
+        self.id = None
+        self.symbol = symbol
+        self.side = side.upper()
+        self.quantity = quantity
+        self.state = PENDING
+        self.filled_qty = 0.0
+        self.children = []
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._timers = []
+
+    @property
+    def done(self) -> bool:
+        return self.state in (COMPLETED, CANCELLED, FAILED)
+
+    def start(self, engine):
+        """Begin execution (called on the engine's loop)"""
+        self.state = RUNNING
+        self.started_at = engine.clock.time()
+
+    def cancel(self, engine):
+        """Stop scheduling children (called on the engine's loop)"""
+        for timer in self._timers:
+            timer.cancel()
+        self._finish(engine, CANCELLED)
+
+    def _schedule(self, engine, when: float, callback):
+        # Forget timers that already fired so polling algos stay small
+        self._timers = [timer for timer in self._timers
+                        if not timer.cancelled and timer.deadline >= engine.wheel.current_tick]
+        self._timers.append(engine.call_at(when, partial(engine.guard, self, callback)))
+
+    def _finish(self, engine, state: str, error: str = None):
+        if self.done:
+            return
+        self.state = state
+        self.error = error
+        self.finished_at = engine.clock.time()
+        logger.info(f"{self.kind} {self.id} {state.lower()}: "
+                    f"{self.filled_qty}/{self.quantity} {self.symbol}")
+
+    def _record_child(self, response: dict):
+        self.children.append({
+            'ref': order_ref(response),
+            'status': order_status(response),
+            'executed_qty': float(response.get('executedQty') or 0)
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'symbol': self.symbol,
+            'side': self.side,
+            'quantity': self.quantity,
+            'filled_qty': self.filled_qty,
+            'state': self.state,
+            'children': len(self.children),
+            'error': self.error,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class TWAPAlgo(Algo):
+    """
+    Split a parent order into equal MARKET slices spread over a duration
+
+    A slice counts towards ``filled_qty`` by its executedQty; slices the
+    exchange has only accepted are polled until they reach a final status.
+    """
+
+    kind = 'TWAP'
+
+    def __init__(self, symbol: str, side: str, quantity: float,
+                 duration: float, slices: int, poll_interval: float = 1.0):
+        """
+        Args:
+            symbol: Trading pair
+            side: BUY or SELL
+            quantity: Total quantity
+            duration: Seconds over which to spread the slices
+            slices: Number of child orders
+            poll_interval: Seconds between status checks of unfilled slices
+        """
+        super().__init__(symbol, side, quantity)
+        if not isinstance(slices, int) or slices < 1:
+            raise ValueError(f"Slices must be a positive integer, got {slices}")
+        if not duration >= 0:
+            raise ValueError(f"Duration must not be negative, got {duration}")
+        self.duration = duration
+        self.slices = slices
+        self.poll_interval = poll_interval
+        self._sent = 0
+        self._settled = 0
+        self._plan = []
+
+    def start(self, engine):
+        super().start(engine)
+        engine.run_blocking(self, partial(engine.order_manager.client.get_symbol_info, self.symbol),
+                            partial(self._on_symbol_info, engine))
+
+    def _on_symbol_info(self, engine, symbol_info, error):
+        if error:
+            self._finish(engine, FAILED, str(error))
+            return
+
+        # Decimal, so the slices land exactly on the step grid and add up
+        step = lot_step(symbol_info)
+        total = Decimal(str(self.quantity))
+        slice_qty = Decimal(str(round_step(self.quantity / self.slices, step) if step
+                                else self.quantity / self.slices))
+        # The last slice takes whatever rounding left over
+        last_qty = total - slice_qty * (self.slices - 1)
+        self._plan = [float(qty) for qty in [slice_qty] * (self.slices - 1) + [last_qty] if qty > 0]
+        if not self._plan:
+            self._finish(engine, FAILED, f"Quantity {self.quantity} is below the step size")
+            return
+
+        interval = self.duration / max(1, len(self._plan) - 1) if len(self._plan) > 1 else 0
+        for index, qty in enumerate(self._plan):
+            self._schedule(engine, self.started_at + index * interval,
+                           partial(self._send_slice, engine, qty))
+
+    def _send_slice(self, engine, qty: float):
+        self._sent += 1
+        engine.run_blocking(self, partial(engine.order_manager.place_order,
+                                          symbol=self.symbol, side=self.side,
+                                          order_type='MARKET', quantity=qty),
+                            partial(self._on_slice, engine, qty))
+
+    def _on_slice(self, engine, qty, response, error):
+        if error:
+            logger.error(f"TWAP {self.id} slice failed: {error}")
+            self.error = str(error)
+            self._settle(engine)
+            return
+        self._record_child(response)
+        self._on_slice_status(engine, order_ref(response), response, None)
+
+    def _poll_slice(self, engine, ref):
+        engine.run_blocking(self, query_order(engine, self.symbol, ref),
+                            partial(self._on_slice_status, engine, ref))
+
+    def _on_slice_status(self, engine, ref, response, error):
+        if self.done:
+            return
+        if error or order_status(response) not in FINAL_STATUSES:
+            if error:
+                logger.warning(f"TWAP {self.id} status check failed: {error}")
+            self._schedule(engine, engine.clock.time() + self.poll_interval,
+                           partial(self._poll_slice, engine, ref))
+            return
+        self.filled_qty = round(self.filled_qty + float(response.get('executedQty') or 0), 12)
+        self._settle(engine)
+
+    def _settle(self, engine):
+        self._settled += 1
+        if self._settled == len(self._plan):
+            self._finish(engine, COMPLETED if self.filled_qty > 0 else FAILED, self.error)
+
+
+class IcebergAlgo(Algo):
+    """Work a LIMIT order showing only ``display_qty`` at a time"""
+
+    kind = 'ICEBERG'
+
+    def __init__(self, symbol: str, side: str, quantity: float, price: float,
+                 display_qty: float, poll_interval: float = 1.0):
+        """
+        Args:
+            symbol: Trading pair
+            side: BUY or SELL
+            quantity: Total quantity
+            price: Limit price of every clip
+            display_qty: Quantity of each visible clip
+            poll_interval: Seconds between status checks of the live clip
+        """
+        super().__init__(symbol, side, quantity)
+        if not display_qty > 0:
+            raise ValueError(f"Display quantity must be positive, got {display_qty}")
+        self.price = price
+        self.display_qty = display_qty
+        self.poll_interval = poll_interval
+        self._live = None
+
+    def start(self, engine):
+        super().start(engine)
+        self._send_clip(engine)
+
+    def cancel(self, engine):
+        if self._live is not None:
+            ref = self._live
+            engine.run_blocking(self, partial(engine.order_manager.client.client.futures_cancel_order,
+                                              symbol=self.symbol, **ref),
+                                lambda response, error: None)
+        super().cancel(engine)
+
+    def _send_clip(self, engine):
+        qty = min(self.display_qty, round(self.quantity - self.filled_qty, 12))
+        engine.run_blocking(self, partial(engine.order_manager.place_order,
+                                          symbol=self.symbol, side=self.side,
+                                          order_type='LIMIT', quantity=qty, price=self.price),
+                            partial(self._on_clip, engine))
+
+    def _on_clip(self, engine, response, error):
+        if error:
+            self._finish(engine, FAILED, str(error))
+            return
+        self._record_child(response)
+        self._live = order_ref(response)
+        self._schedule(engine, engine.clock.time() + self.poll_interval, partial(self._poll, engine))
+
+    def _poll(self, engine):
+        engine.run_blocking(self, query_order(engine, self.symbol, self._live),
+                            partial(self._on_status, engine))
+
+    def _on_status(self, engine, response, error):
+        if self.done:
+            return
+        if error:
+            logger.warning(f"ICEBERG {self.id} status check failed: {error}")
+            self._schedule(engine, engine.clock.time() + self.poll_interval, partial(self._poll, engine))
+            return
+
+        status = order_status(response)
+        if status not in FINAL_STATUSES:
+            self._schedule(engine, engine.clock.time() + self.poll_interval, partial(self._poll, engine))
+            return
+
+        self._live = None
+        self.filled_qty = round(self.filled_qty + float(response.get('executedQty') or 0), 12)
+        if status != 'FILLED':
+            self._finish(engine, FAILED, f"Clip {status.lower()}")
+        elif self.filled_qty >= self.quantity:
+            self._finish(engine, COMPLETED)
+        else:
+            self._send_clip(engine)
+
+
+class BracketAlgo(Algo):
+    """
+    Entry order followed by a stop-loss / take-profit pair (OCO)
+
+    Once the entry fills, both exit legs are placed as reduce-only
+    conditional orders; when one of them finishes the other is cancelled.
+    A leg the exchange refuses, or that ends without triggering (cancelled,
+    expired), is placed again; if it still cannot be placed the position is
+    closed at market rather than left half protected.
+    """
+
+    kind = 'BRACKET'
+
+    def __init__(self, symbol: str, side: str, quantity: float,
+                 stop_loss: float, take_profit: float, entry_price: float = None,
+                 poll_interval: float = 1.0, leg_attempts: int = 3):
+        """
+        Args:
+            symbol: Trading pair
+            side: Entry side, BUY or SELL
+            quantity: Position size
+            stop_loss: Stop-loss trigger price
+            take_profit: Take-profit trigger price
+            entry_price: LIMIT entry price (MARKET entry when omitted)
+            poll_interval: Seconds between status checks (and leg retries)
+            leg_attempts: Tries per exit leg before the position is flattened
+        """
+        super().__init__(symbol, side, quantity)
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.entry_price = entry_price
+        self.poll_interval = poll_interval
+        self.leg_attempts = leg_attempts
+        self._entry = None
+        self._legs = {}
+        self._leg_tries = {}
+        self._flattening = False
+        self._polling = False
+
+    @property
+    def exit_side(self) -> str:
+        return 'SELL' if self.side == 'BUY' else 'BUY'
+
+    def start(self, engine):
+        super().start(engine)
+        order_type = 'LIMIT' if self.entry_price else 'MARKET'
+        engine.run_blocking(self, partial(engine.order_manager.place_order,
+                                          symbol=self.symbol, side=self.side,
+                                          order_type=order_type, quantity=self.quantity,
+                                          price=self.entry_price),
+                            partial(self._on_entry, engine))
+
+    def cancel(self, engine):
+        refs = list(self._legs.values())
+        if self._entry is not None and self.filled_qty == 0:
+            refs.append(self._entry)
+        for ref in refs:
+            self._cancel_ref(engine, ref)
+        super().cancel(engine)
+
+    def _cancel_ref(self, engine, ref):
+        engine.run_blocking(self, partial(engine.order_manager.client.client.futures_cancel_order,
+                                          symbol=self.symbol, **ref),
+                            lambda response, error: None)
+
+    def _on_entry(self, engine, response, error):
+        if error:
+            self._finish(engine, FAILED, str(error))
+            return
+        self._record_child(response)
+        self._entry = order_ref(response)
+        self._on_entry_status(engine, response, None)
+
+    def _poll_entry(self, engine):
+        engine.run_blocking(self, query_order(engine, self.symbol, self._entry),
+                            partial(self._on_entry_status, engine))
+
+    def _on_entry_status(self, engine, response, error):
+        if self.done:
+            return
+        status = None if error else order_status(response)
+        if status == 'FILLED':
+            self.filled_qty = float(response.get('executedQty') or self.quantity)
+            self._place_legs(engine)
+        elif status in FINAL_STATUSES:
+            self._finish(engine, FAILED, f"Entry {status.lower()}")
+        else:
+            self._schedule(engine, engine.clock.time() + self.poll_interval,
+                           partial(self._poll_entry, engine))
+
+    def _place_legs(self, engine):
+        for leg in ('stop_loss', 'take_profit'):
+            self._place_leg(engine, leg)
+
+    def _place_leg(self, engine, leg):
+        if self._flattening:
+            return
+        order_type, trigger = {
+            'stop_loss': ('STOP_MARKET', self.stop_loss),
+            'take_profit': ('TAKE_PROFIT_MARKET', self.take_profit),
+        }[leg]
+        self._leg_tries[leg] = self._leg_tries.get(leg, 0) + 1
+        engine.run_blocking(self, partial(engine.order_manager.place_order,
+                                          symbol=self.symbol, side=self.exit_side,
+                                          order_type=order_type, quantity=self.filled_qty,
+                                          stopPrice=trigger, reduceOnly='true'),
+                            partial(self._on_leg, engine, leg),
+                            late=partial(self._on_late_leg, engine, leg))
+
+    def _on_late_leg(self, engine, leg, response, error):
+        # The algo finished while the leg was in flight: do not leave it live
+        if error is None and response:
+            logger.warning(f"BRACKET {self.id} {leg} leg answered after the algo ended, cancelling")
+            self._cancel_ref(engine, order_ref(response))
+
+    def _on_leg(self, engine, leg, response, error):
+        if error:
+            if self._leg_tries[leg] < self.leg_attempts:
+                logger.warning(f"BRACKET {self.id} {leg} leg failed ({error}), retrying")
+                self._schedule(engine, engine.clock.time() + self.poll_interval,
+                               partial(self._place_leg, engine, leg))
+            else:
+                self._flatten(engine, f"{leg} leg failed: {error}")
+            return
+        self._record_child(response)
+        if self._flattening:
+            self._cancel_ref(engine, order_ref(response))
+            return
+        self._legs[leg] = order_ref(response)
+        if len(self._legs) == 2 and not self._polling:
+            self._polling = True
+            self._schedule(engine, engine.clock.time() + self.poll_interval,
+                           partial(self._poll_legs, engine))
+
+    def _flatten(self, engine, reason: str):
+        """Close the position at market: one unprotected side is worse than none"""
+        if self._flattening:
+            return
+        self._flattening = True
+        logger.error(f"BRACKET {self.id} {reason}, flattening the position")
+        for timer in self._timers:
+            timer.cancel()
+        for ref in self._legs.values():
+            self._cancel_ref(engine, ref)
+        self._legs = {}
+        engine.run_blocking(self, partial(engine.order_manager.place_order,
+                                          symbol=self.symbol, side=self.exit_side,
+                                          order_type='MARKET', quantity=self.filled_qty,
+                                          reduceOnly='true'),
+                            partial(self._on_flatten, engine, reason))
+
+    def _on_flatten(self, engine, reason, response, error):
+        if error:
+            logger.error(f"BRACKET {self.id} could not flatten, position is unprotected: {error}")
+            self._finish(engine, FAILED, f"{reason}; flatten failed: {error}")
+            return
+        self._record_child(response)
+        self._finish(engine, FAILED, f"{reason}; position flattened")
+
+    def _poll_legs(self, engine):
+        for leg, ref in self._legs.items():
+            engine.run_blocking(self, query_order(engine, self.symbol, ref),
+                                partial(self._on_leg_status, engine, leg))
+        self._schedule(engine, engine.clock.time() + self.poll_interval,
+                       partial(self._poll_legs, engine))
+
+    def _on_leg_status(self, engine, leg, response, error):
+        if self.done or error or self._flattening or leg not in self._legs:
+            return
+        status = order_status(response)
+        if status in TRIGGERED_STATUSES:
+            other = 'take_profit' if leg == 'stop_loss' else 'stop_loss'
+            ref = self._legs.pop(other, None)
+            if ref is not None:
+                self._cancel_ref(engine, ref)
+            for timer in self._timers:
+                timer.cancel()
+            logger.info(f"BRACKET {self.id} exited via {leg}")
+            self._finish(engine, COMPLETED)
+        elif status in FINAL_STATUSES:
+            # Cancelled or expired without firing: the position lost that side
+            del self._legs[leg]
+            if self._leg_tries[leg] < self.leg_attempts:
+                logger.warning(f"BRACKET {self.id} {leg} leg {status.lower()}, placing it again")
+                self._place_leg(engine, leg)
+            else:
+                self._flatten(engine, f"{leg} leg {status.lower()}")
+
+
+class ExecutionEngine:
+    """
+    Runs algo parent orders on an asyncio event loop
+
+    Timers live in a single TimerWheel advanced by the loop every tick.
+    Exchange calls are blocking, so they run in a thread pool and report
+    back to the loop; algo state is only ever touched from the loop thread.
+
+    For live use call ``start()`` to run the loop in a background thread.
+    For fast-forward runs pass a SimulatedClock and await ``run_for()``.
+    """
+
+    def __init__(self, order_manager, clock=None, tick: float = 0.1,
+                 wheel_size: int = 512, max_workers: int = 8):
+        """
+        Args:
+            order_manager: OrderManager (or simulated equivalent) placing child orders
+            clock: WallClock (default) or SimulatedClock
+            tick: Timer resolution in seconds
+            wheel_size: Timer wheel slots
+            max_workers: Concurrent exchange calls
+        """
+        self.order_manager = order_manager
+        self.clock = clock or WallClock()
+        self.wheel = TimerWheel(tick, wheel_size, self.clock.time())
+        self.algos = {}
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='algo')
+        self._pending = set()
+        self._loop = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def simulated(self) -> bool:
+        return isinstance(self.clock, SimulatedClock)
+
+    # Thread-safe entry points
+
+    def submit(self, algo: Algo) -> int:
+        """Register an algo and start it on the engine's loop"""
+        algo.id = next(self._ids)
+        self.algos[algo.id] = algo
+        self._call_soon(partial(self.guard, algo, partial(algo.start, self)))
+        logger.info(f"{algo.kind} {algo.id} submitted: {algo.side} {algo.quantity} {algo.symbol}")
+        return algo.id
+
+    def cancel(self, algo_id: int) -> bool:
+        """Cancel a running algo"""
+        algo = self.algos.get(algo_id)
+        if algo is None or algo.done:
+            return False
+        self._call_soon(partial(algo.cancel, self))
+        return True
+
+    def status(self, algo_id: int = None):
+        """Progress of one algo, or of every algo"""
+        if algo_id is not None:
+            algo = self.algos.get(algo_id)
+            return algo.to_dict() if algo else None
+        return [algo.to_dict() for algo in self.algos.values()]
+
+    def start(self):
+        """Run the engine loop in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._running = True
+            ready.set()
+            self._loop.run_until_complete(self._drive())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='execution-engine', daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        """Stop the engine loop"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    async def run_for(self, seconds: float):
+        """
+        Drive the engine on the current loop for ``seconds`` of clock time
+
+        With a SimulatedClock this fast-forwards: the clock advances one tick
+        at a time as soon as all in-flight child requests have answered.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        await self._drive(until=self.clock.time() + seconds)
+        self._running = False
+
+    # Loop-side helpers used by algos
+
+    def call_at(self, when: float, callback):
+        return self.wheel.schedule(when, callback)
+
+    def guard(self, algo: Algo, callback, *args, late=None):
+        """
+        Run an algo callback, failing the algo instead of the loop on error
+
+        Once the algo is done the callback is skipped and ``late`` (if any)
+        runs instead, e.g. to cancel an order whose response came too late.
+        """
+        if algo.done:
+            callback = late
+            if callback is None:
+                return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"{algo.kind} {algo.id} failed: {e}")
+            algo._finish(self, FAILED, str(e))
+
+    def run_blocking(self, algo: Algo, function, callback, late=None):
+        """
+        Run an exchange call in the pool, then ``callback(result, error)`` on
+        the loop (``late(result, error)`` if the algo finished meanwhile)
+        """
+        future = self._loop.run_in_executor(self._executor, function)
+        self._pending.add(future)
+
+        def done(future):
+            self._pending.discard(future)
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            self.guard(algo, callback, result, error, late=late)
+
+        future.add_done_callback(done)
+
+    def _call_soon(self, callback):
+        if self._loop is not None and self._running:
+            self._loop.call_soon_threadsafe(callback)
+        else:
+            # Not running yet: fire on the first tick
+            self.wheel.schedule(self.clock.time(), callback)
+
+    async def _drive(self, until: float = None):
+        while self._running:
+            self.wheel.advance(self.clock.time())
+
+            if not self.simulated:
+                await asyncio.sleep(self.wheel.tick)
+                continue
+
+            # Fast-forward: settle in-flight requests before moving time on
+            if self._pending:
+                await asyncio.wait(list(self._pending))
+                await asyncio.sleep(0)
+                continue
+            if until is not None and self.clock.time() >= until:
+                break
+            self.clock.advance(self.wheel.tick)
+            await asyncio.sleep(0)
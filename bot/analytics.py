@@ -0,0 +1,384 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only speeds up rebuild_from_history
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Largest page userTrades / income history return
+HISTORY_PAGE_SIZE = 1000
+
+# Binance keeps income history for three months
+INCOME_HISTORY_MS = 90 * 24 * 3600 * 1000
+
+# Longest time range one userTrades query may span
+TRADES_WINDOW_MS = 7 * 24 * 3600 * 1000
+
+
+def _day(timestamp_ms) -> str:
+    seconds = timestamp_ms / 1000 if timestamp_ms else time.time()
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def _empty_totals() -> dict:
+    return {'realized_pnl': 0.0, 'fees': 0.0, 'funding': 0.0, 'volume': 0.0, 'trades': 0}
+
+
+def fetch_trades(client, symbol: str, from_id: int = 0, start_time: int = None,
+                 limit: int = HISTORY_PAGE_SIZE) -> list:
+    """
+    All account trades on ``symbol`` with id >= ``from_id``, paging by trade id
+
+    With ``start_time`` (ms) the trades start at that time instead. A time
+    query spans at most seven days, so empty windows are skipped until the
+    first trade is found, and paging continues by id from there.
+    """
+    trades = []
+    now = int(time.time() * 1000)
+    while True:
+        if start_time is not None:
+            end_time = min(start_time + TRADES_WINDOW_MS - 1, now)
+            page = client.futures_account_trades(symbol=symbol, startTime=start_time,
+                                                 endTime=end_time, limit=limit)
+            if not page and end_time < now:
+                start_time = end_time + 1
+                continue
+            start_time = None
+        else:
+            page = client.futures_account_trades(symbol=symbol, fromId=from_id, limit=limit)
+        trades.extend(page)
+        if len(page) < limit:
+            return trades
+        from_id = max(int(trade['id']) for trade in page) + 1
+
+
+def fetch_funding(client, start_time: int = None, limit: int = HISTORY_PAGE_SIZE) -> list:
+    """All FUNDING_FEE income since ``start_time`` (ms, default the retained history), paging by time"""
+    if start_time is None:
+        start_time = int(time.time() * 1000) - INCOME_HISTORY_MS
+    rows = []
+    seen = set()
+    while True:
+        page = client.futures_income_history(incomeType='FUNDING_FEE', startTime=start_time, limit=limit)
+        for row in page:
+            # Pages overlap on the boundary millisecond
+            key = (row.get('tranId'), row['symbol'], row['time'])
+            if key not in seen:
+                seen.add(key)
+                rows.append(row)
+        if len(page) < limit:
+            return rows
+        last = max(int(row['time']) for row in page)
+        start_time = last if last > start_time else start_time + 1
+
+
+class AnalyticsEngine:
+    """
+    Portfolio / PnL analytics updated incrementally from fills
+
+    Positions use average-cost accounting. Every fill, funding payment and
+    mark price update adjusts the per-symbol, per-day and total figures in
+    place, so snapshot() never reprocesses trade history. State is saved as
+    JSON and reloaded on start.
+
+    Order responses carry no commission and funding is not an order event,
+    so sync() (run periodically by start()) adds both from the trade and
+    income history newer than the cursors it keeps.
+    """
+
+    def __init__(self, path: str = None, persist_interval: float = 5.0):
+        """
+        Args:
+            path: JSON file the state is persisted to (None keeps it in memory)
+            persist_interval: Minimum seconds between automatic saves
+        """
+        self.path = path
+        self.persist_interval = persist_interval
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._reset()
+        if path and os.path.exists(path):
+            self.load()
+
+    def _reset(self):
+        self.symbols = {}
+        self.days = {}
+        self.totals = _empty_totals()
+        self.unrealized_pnl = 0.0
+        self.updated = None
+        now = int(time.time() * 1000)
+        # since: when tracking began (earlier trades are not ours to count);
+        # trades: symbol -> next trade id; funding: next income time (ms)
+        self.cursors = {'since': now, 'trades': {}, 'funding': now}
+
+    def _symbol(self, symbol: str) -> dict:
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = dict(_empty_totals(), position=0.0, entry_price=0.0,
+                                                mark_price=0.0, unrealized_pnl=0.0)
+        return state
+
+    def _add(self, symbol: str, timestamp_ms, **amounts):
+        day = self.days.setdefault(_day(timestamp_ms), _empty_totals())
+        state = self._symbol(symbol)
+        for key, amount in amounts.items():
+            state[key] += amount
+            day[key] += amount
+            self.totals[key] += amount
+        self.updated = timestamp_ms or int(time.time() * 1000)
+
+    def _revalue(self, state: dict):
+        """Recompute one symbol's unrealized PnL, keeping the total in step"""
+        if state['mark_price'] and state['position']:
+            unrealized = (state['mark_price'] - state['entry_price']) * state['position']
+        else:
+            unrealized = 0.0
+        self.unrealized_pnl += unrealized - state['unrealized_pnl']
+        state['unrealized_pnl'] = unrealized
+
+    def _apply_fill(self, symbol: str, side: str, quantity: float, price: float):
+        """Update average-cost position; return the realized PnL of the fill"""
+        state = self._symbol(symbol)
+        position = state['position']
+        signed = quantity if side == 'BUY' else -quantity
+        realized = 0.0
+
+        if position == 0 or (position > 0) == (signed > 0):
+            # Opening or adding: blend the entry price
+            total = abs(position) + quantity
+            state['entry_price'] = (abs(position) * state['entry_price'] + quantity * price) / total
+        else:
+            closed = min(quantity, abs(position))
+            realized = closed * (price - state['entry_price']) * (1 if position > 0 else -1)
+            if quantity > abs(position):
+                # Flipped: the remainder opens a new position at the fill price
+                state['entry_price'] = price
+
+        state['position'] = round(position + signed, 12)
+        if state['position'] == 0:
+            state['entry_price'] = 0.0
+        if not state['mark_price']:
+            state['mark_price'] = price
+        return realized
+
+    def on_fill(self, account: str, fill: dict):
+        """
+        Fill listener for OrderManager (symbol, side, quantity, price, time)
+
+        Commission is not taken from the fill; sync() adds it per trade.
+        """
+        with self._lock:
+            realized = self._apply_fill(fill['symbol'], fill['side'], fill['quantity'], fill['price'])
+            self._add(fill['symbol'], fill.get('time'),
+                      realized_pnl=realized,
+                      volume=fill['quantity'] * fill['price'],
+                      trades=1)
+            self._revalue(self.symbols[fill['symbol']])
+        self._maybe_save()
+
+    def on_funding(self, symbol: str, amount: float, timestamp_ms: int = None):
+        """Record a funding payment (positive when received)"""
+        with self._lock:
+            self._add(symbol, timestamp_ms, funding=amount)
+        self._maybe_save()
+
+    def sync(self, client):
+        """
+        Add commission from trades and funding from income since the last sync
+
+        Args:
+            client: python-binance Client of the account
+        """
+        with self._lock:
+            symbols = list(self.symbols)
+            cursors = {'since': self.cursors['since'], 'funding': self.cursors['funding'],
+                       'trades': dict(self.cursors['trades'])}
+
+        for symbol in symbols:
+            from_id = cursors['trades'].get(symbol)
+            trades = fetch_trades(client, symbol, from_id=from_id or 0,
+                                  start_time=cursors['since'] if from_id is None else None)
+            trades = [trade for trade in trades if int(trade['time']) >= cursors['since']]
+            with self._lock:
+                for trade in trades:
+                    self._add(symbol, trade['time'], fees=float(trade.get('commission') or 0))
+                if trades:
+                    self.cursors['trades'][symbol] = max(int(trade['id']) for trade in trades) + 1
+
+        rows = fetch_funding(client, start_time=cursors['funding'])
+        with self._lock:
+            for row in rows:
+                self._add(row['symbol'], row['time'], funding=float(row['income']))
+            if rows:
+                self.cursors['funding'] = max(int(row['time']) for row in rows) + 1
+        self._maybe_save()
+
+    def start(self, client, interval: float = 60.0):
+        """Call sync() every ``interval`` seconds from a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.sync(client)
+                except Exception as e:
+                    logger.error(f"Analytics sync failed: {e}")
+
+        self._thread = threading.Thread(target=run, name='analytics-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background sync"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def update_mark_price(self, symbol: str, price: float):
+        with self._lock:
+            state = self.symbols.get(symbol)
+            if state is None:
+                return
+            state['mark_price'] = price
+            self._revalue(state)
+
+    def snapshot(self) -> dict:
+        """Current analytics (a copy, consistent with itself); cost does not grow with trade history"""
+        with self._lock:
+            net = (self.totals['realized_pnl'] + self.unrealized_pnl
+                   - self.totals['fees'] + self.totals['funding'])
+            return {
+                'totals': dict(self.totals, unrealized_pnl=self.unrealized_pnl, net_pnl=net),
+                'symbols': {symbol: dict(state) for symbol, state in self.symbols.items()},
+                'days': {day: dict(totals) for day, totals in self.days.items()},
+                'updated': self.updated
+            }
+
+    def rebuild_from_history(self, trades: list, income: list = None):
+        """
+        Replace the state with one rebuilt from trade and funding history
+
+        Realized PnL is recomputed with the same average-cost accounting as
+        live fills (Binance's realizedPnl is not used), so a rebuild agrees
+        with the state it replaces.
+
+        Args:
+            trades: futures_account_trades() rows (id, symbol, side, price,
+                qty, commission, time), any order
+            income: futures_income_history(incomeType='FUNDING_FEE') rows
+        """
+        trades = sorted(trades, key=lambda trade: trade['time'])
+        with self._lock:
+            marks = {symbol: state['mark_price'] for symbol, state in self.symbols.items()}
+            self._reset()
+            # Position and entry price depend on order, so fills replay one by one
+            realized = [self._apply_fill(trade['symbol'], trade['side'],
+                                         float(trade['qty']), float(trade['price']))
+                        for trade in trades]
+            if np is not None and trades:
+                self._aggregate_numpy(trades, realized)
+            else:
+                for trade, pnl in zip(trades, realized):
+                    self._add(trade['symbol'], trade['time'], realized_pnl=pnl,
+                              fees=float(trade.get('commission') or 0),
+                              volume=float(trade['qty']) * float(trade['price']), trades=1)
+
+            for row in income or []:
+                self._add(row['symbol'], row['time'], funding=float(row['income']))
+
+            # Later syncs continue after the rebuilt history
+            for trade in trades:
+                self.cursors['trades'][trade['symbol']] = max(
+                    self.cursors['trades'].get(trade['symbol'], 0), int(trade['id']) + 1)
+            if income:
+                self.cursors['funding'] = max(int(row['time']) for row in income) + 1
+
+            last_prices = {trade['symbol']: float(trade['price']) for trade in trades}
+            for symbol, state in self.symbols.items():
+                state['mark_price'] = marks.get(symbol) or last_prices.get(symbol) or state['mark_price']
+                self._revalue(state)
+        logger.info(f"Analytics rebuilt from {len(trades)} trades")
+        self.save()
+
+    def _aggregate_numpy(self, trades: list, realized: list):
+        """Per-day and per-symbol sums of the replayed trades in a few vector passes"""
+        symbols = np.array([trade['symbol'] for trade in trades])
+        days = np.array([_day(trade['time']) for trade in trades])
+        qty = np.array([float(trade['qty']) for trade in trades])
+        price = np.array([float(trade['price']) for trade in trades])
+        fees = np.array([float(trade.get('commission') or 0) for trade in trades])
+        realized = np.array(realized)
+        volume = qty * price
+
+        def aggregate(keys):
+            unique, index = np.unique(keys, return_inverse=True)
+            sums = {}
+            for name, values in (('realized_pnl', realized), ('fees', fees), ('volume', volume)):
+                sums[name] = np.bincount(index, weights=values, minlength=len(unique))
+            counts = np.bincount(index, minlength=len(unique))
+            return [(key, {name: float(sums[name][i]) for name in sums}, int(counts[i]))
+                    for i, key in enumerate(unique)]
+
+        for day, sums, count in aggregate(days):
+            self.days[str(day)] = dict(_empty_totals(), trades=count, **sums)
+        for symbol, sums, count in aggregate(symbols):
+            self._symbol(str(symbol)).update(sums, trades=count)
+            for name in sums:
+                self.totals[name] += sums[name]
+            self.totals['trades'] += count
+        self.updated = int(trades[-1]['time'])
+
+    def _maybe_save(self):
+        if self.path and time.monotonic() - self._last_save >= self.persist_interval:
+            self.save()
+
+    def save(self):
+        """Write the state to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            payload = json.dumps({
+                'symbols': self.symbols,
+                'days': self.days,
+                'totals': self.totals,
+                'updated': self.updated,
+                'cursors': self.cursors
+            })
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # Unique temp file per writer, so concurrent saves cannot clash
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.path)}.", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """Load persisted state from disk"""
+        with open(self.path) as f:
+            data = json.load(f)
+        with self._lock:
+            self._reset()
+            self.symbols = data.get('symbols', {})
+            self.days = data.get('days', {})
+            self.totals.update(data.get('totals', {}))
+            self.updated = data.get('updated')
+            self.cursors.update(data.get('cursors', {}))
+            self.unrealized_pnl = sum(state.get('unrealized_pnl', 0.0) for state in self.symbols.values())
+        logger.info(f"Analytics loaded from {self.path}")
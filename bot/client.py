@@ -1,13 +1,96 @@
 from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceOrderException
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote
 import logging
+import os
+import threading
+import time
+from .ratelimit import RateLimitTimeout, futures_weight
+from .signing import HmacSigner, ServerTimeSync
 
 logger = logging.getLogger(__name__)
 
+
+class SignedClient(Client):
+    """
+    python-binance Client signing with a precomputed HMAC context
+
+    The API key and signer are held as one tuple that set_credentials()
+    replaces in a single assignment. Each request reads the tuple once and
+    sends the key header and signature from the same snapshot, so a
+    rotation never mixes an old key with a new secret and requests already
+    in flight finish with the credentials they started with.
+    """
+    
+    def __init__(self, api_key: str, api_secret: str, rate_limiter=None,
+                 ip_rate_limiter=None, rate_limit_timeout: float = None, **kwargs):
+        self._credentials = (api_key, HmacSigner(api_secret))
+        self._request_local = threading.local()
+        self.rate_limiter = rate_limiter
+        self.ip_rate_limiter = ip_rate_limiter
+        self.rate_limit_timeout = rate_limit_timeout
+        self.timestamp_offset = 0
+        super().__init__(api_key=api_key, api_secret=api_secret, **kwargs)
+    
+    @property
+    def signer(self) -> HmacSigner:
+        return self._credentials[1]
+    
+    def set_credentials(self, api_key: str, api_secret: str):
+        """Swap the API key and secret; the session and its connections are kept"""
+        self._credentials = (api_key, HmacSigner(api_secret))
+        self.API_KEY = api_key
+        self.API_SECRET = api_secret
+        self.session.headers['X-MBX-APIKEY'] = api_key
+    
+    def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        api_key, signer = self._credentials
+        if api_key:
+            # Per-request header; python-binance merges data['headers'] into the request
+            data = kwargs.setdefault('data', {})
+            data['headers'] = dict(data.get('headers') or {}, **{'X-MBX-APIKEY': api_key})
+        self._request_local.signer = signer
+        try:
+            return super()._request(method, uri, signed, force_params, **kwargs)
+        finally:
+            self._request_local.signer = None
+    
+    def _request_futures_api(self, method, path, *args, **kwargs):
+        if self.rate_limiter is not None or self.ip_rate_limiter is not None:
+            weight = futures_weight(method, path, kwargs.get('data'))
+            for limiter in (self.rate_limiter, self.ip_rate_limiter):
+                if limiter is not None and not limiter.acquire(weight, self.rate_limit_timeout):
+                    raise RateLimitTimeout(
+                        f"Request weight limit reached, {path} not sent within "
+                        f"{self.rate_limit_timeout}s"
+                    )
+        return super()._request_futures_api(method, path, *args, **kwargs)
+    
+    def _generate_signature(self, data, uri_encode=True) -> str:
+        # RSA / Ed25519 keys keep python-binance's own signing
+        if getattr(self, 'PRIVATE_KEY', None):
+            return super()._generate_signature(data, uri_encode)
+        
+        # Same payload python-binance signs, without re-keying the HMAC
+        query_string = '&'.join(
+            f"{key}={quote(value) if key == 'symbol' else value}"
+            for key, value in self._order_params(data)
+        )
+        signer = getattr(self._request_local, 'signer', None) or self.signer
+        return signer.sign(query_string)
+
+
 class BinanceFuturesClient:
     """Wrapper for Binance Futures API client"""
     
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
+    # Seconds before cached exchange info is fetched again
+    EXCHANGE_INFO_TTL = 300
+    
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True,
+                 time_sync_interval: float = 30.0, pool_size: int = 10,
+                 rate_limiter=None, futures_url: str = None, ip_rate_limiter=None,
+                 rate_limit_timeout: float = None):
         """
         Initialize Binance Futures client
         
@@ -15,22 +98,59 @@ class BinanceFuturesClient:
             api_key: Binance API key
             api_secret: Binance API secret
             testnet: Use testnet (default: True)
+            time_sync_interval: Seconds between server time syncs (0 disables)
+            pool_size: HTTP connections kept open to Binance
+            rate_limiter: Optional RateLimiter charged each futures request's weight
+            futures_url: Override the futures REST base URL, e.g. a local stub
+                exchange (default: BINANCE_FUTURES_URL environment variable)
+            ip_rate_limiter: Optional RateLimiter shared by every client on
+                this IP (see ratelimit.ip_rate_limiter)
+            rate_limit_timeout: Longest wait for request weight before
+                RateLimitTimeout is raised (None waits indefinitely)
         """
         self.api_key = api_key
         self.api_secret = api_secret
         self.testnet = testnet
         
+        futures_url = futures_url or os.getenv('BINANCE_FUTURES_URL')
+        
         # Initialize client
-        self.client = Client(
+        self.client = SignedClient(
             api_key=api_key,
             api_secret=api_secret,
-            testnet=testnet
+            testnet=testnet,
+            rate_limiter=rate_limiter,
+            ip_rate_limiter=ip_rate_limiter,
+            rate_limit_timeout=rate_limit_timeout,
+            # The spot ping is only a DNS/TLS warm-up and cannot reach a stub
+            ping=futures_url is None
         )
         
+        # Size the connection pool for concurrent requests
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.client.session.mount('https://', adapter)
+        self.client.session.mount('http://', adapter)
+        
+        # Exchange info cache shared by all symbol lookups
+        self._exchange_info = None
+        self._symbols = {}
+        self._tradable = frozenset()
+        self._exchange_info_fetched = 0.0
+        self._exchange_info_lock = threading.Lock()
+        
         # Set futures testnet URL
         if testnet:
             self.client.FUTURES_URL = 'https://testnet.binancefuture.com'
         
+        if futures_url:
+            self.client.FUTURES_URL = futures_url.rstrip('/') + '/fapi'
+            self.client.FUTURES_TESTNET_URL = self.client.FUTURES_URL
+        
+        # Keep signed request timestamps on server time
+        self.time_sync = ServerTimeSync(self.client, interval=time_sync_interval or 30.0)
+        if time_sync_interval:
+            self.time_sync.start()
+        
         logger.info(f"Binance Futures client initialized (Testnet: {testnet})")
     
     def get_account_info(self):
@@ -43,19 +163,55 @@ class BinanceFuturesClient:
             logger.error(f"Failed to get account info: {e}")
             raise
     
+    def get_exchange_info(self, refresh: bool = False):
+        """Get futures exchange info, cached for EXCHANGE_INFO_TTL seconds"""
+        if (not refresh and self._exchange_info is not None
+                and time.monotonic() - self._exchange_info_fetched < self.EXCHANGE_INFO_TTL):
+            return self._exchange_info
+        
+        with self._exchange_info_lock:
+            # Another thread may have refreshed while we waited
+            if (not refresh and self._exchange_info is not None
+                    and time.monotonic() - self._exchange_info_fetched < self.EXCHANGE_INFO_TTL):
+                return self._exchange_info
+            
+            exchange_info = self.client.futures_exchange_info()
+            self._symbols = {info['symbol']: info for info in exchange_info['symbols']}
+            tradable = frozenset(symbol for symbol, info in self._symbols.items()
+                                 if info.get('status', 'TRADING') == 'TRADING')
+            if tradable != self._tradable:
+                logger.info(f"Tradable symbols changed: {len(tradable - self._tradable)} listed, "
+                            f"{len(self._tradable - tradable)} delisted")
+                self._tradable = tradable
+            self._exchange_info = exchange_info
+            self._exchange_info_fetched = time.monotonic()
+            logger.info(f"Exchange info refreshed ({len(self._symbols)} symbols)")
+            return exchange_info
+    
     def get_symbol_info(self, symbol: str):
         """Get symbol information including filters"""
         try:
-            exchange_info = self.client.futures_exchange_info()
-            for symbol_info in exchange_info['symbols']:
-                if symbol_info['symbol'] == symbol:
-                    logger.info(f"Symbol info retrieved for {symbol}")
-                    return symbol_info
-            raise ValueError(f"Symbol {symbol} not found")
+            self.get_exchange_info()
+            symbol_info = self._symbols.get(symbol)
+            if symbol_info is None:
+                raise ValueError(f"Symbol {symbol} not found")
+            return symbol_info
         except BinanceAPIException as e:
             logger.error(f"Failed to get symbol info: {e}")
             raise
     
+    def set_credentials(self, api_key: str, api_secret: str):
+        """Rotate API credentials in place, keeping connections and caches warm"""
+        self.client.set_credentials(api_key, api_secret)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        logger.info("API credentials rotated")
+    
+    def tradable_symbols(self) -> frozenset:
+        """Symbols currently trading, from the cached exchange info"""
+        self.get_exchange_info()
+        return self._tradable
+    
     def test_connectivity(self):
         """Test connection to Binance Futures API"""
         try:
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+OK = 'ok'
+DEGRADED = 'degraded'
+DOWN = 'down'
+
+# Futures REQUEST_WEIGHT per minute, used until exchange info says otherwise
+DEFAULT_WEIGHT_LIMIT = 2400
+
+
+class HealthMonitor:
+    """
+    Background health probes for one account's exchange connection
+
+    A daemon thread pings the API, checks the server time sync, reads the
+    used request weight Binance reports on every response and the lag of
+    recorded market data streams. The account summary is refreshed on a
+    slower schedule. Health endpoints read the cached report, so they
+    cost no exchange weight however often they are polled.
+    """
+
+    def __init__(self, client, interval: float = 15.0, account_interval: float = 60.0,
+                 max_latency_ms: float = 1000.0, min_weight_headroom: float = 0.1,
+                 max_stream_lag_ms: float = None, failures_before_down: int = 2,
+                 stream_times=None):
+        """
+        Args:
+            client: BinanceFuturesClient to probe
+            interval: Seconds between probes
+            account_interval: Seconds between account snapshot refreshes
+            max_latency_ms: Ping latency above which the account is degraded
+            min_weight_headroom: Fraction of the weight limit that must be left
+            max_stream_lag_ms: Stream lag above which the account is degraded
+                (None reports lag without acting on it)
+            failures_before_down: Consecutive failed pings before reporting down
+            stream_times: Callable returning {stream name: last event time in ms}
+        """
+        self.client = client
+        self.interval = interval
+        self.account_interval = account_interval
+        self.max_latency_ms = max_latency_ms
+        self.min_weight_headroom = min_weight_headroom
+        self.max_stream_lag_ms = max_stream_lag_ms
+        self.failures_before_down = failures_before_down
+        self.stream_times = stream_times
+        self.failures = 0
+        self._report = {'status': DOWN, 'checked_at': None, 'issues': ['Not probed yet']}
+        self._account = None
+        self._account_fetched = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ping(self) -> dict:
+        started = time.perf_counter()
+        try:
+            self.client.client.futures_ping()
+        except Exception as e:
+            self.failures += 1
+            return {'ok': False, 'error': str(e), 'consecutive_failures': self.failures}
+        self.failures = 0
+        return {'ok': True, 'latency_ms': (time.perf_counter() - started) * 1000}
+
+    def _time_sync(self) -> dict:
+        sync = self.client.time_sync
+        age = time.time() - sync.last_sync if sync.last_sync else None
+        return {
+            'offset_ms': sync.offset_ms,
+            'rtt_ms': sync.rtt_ms,
+            'age_s': age,
+            # The offset is applied to signed requests; a stale one means drift goes unnoticed
+            'stale': age is None or age > sync.interval * 3
+        }
+
+    def _weight_limit(self) -> int:
+        exchange_info = self.client._exchange_info or {}
+        for limit in exchange_info.get('rateLimits', []):
+            if (limit.get('rateLimitType') == 'REQUEST_WEIGHT'
+                    and limit.get('interval') == 'MINUTE' and limit.get('intervalNum') == 1):
+                return limit['limit']
+        return DEFAULT_WEIGHT_LIMIT
+
+    def _rate_limit(self) -> dict:
+        response = getattr(self.client.client, 'response', None)
+        used = None
+        if response is not None:
+            header = response.headers.get('x-mbx-used-weight-1m')
+            used = int(header) if header is not None else None
+        limit = self._weight_limit()
+        rate_limiter = self.client.client.rate_limiter
+        ip_rate_limiter = self.client.client.ip_rate_limiter
+        return {
+            'used_weight_1m': used,
+            'weight_limit_1m': limit,
+            'headroom': None if used is None else max(0.0, 1 - used / limit),
+            'local_tokens': rate_limiter.available if rate_limiter is not None else None,
+            'ip_tokens': ip_rate_limiter.available if ip_rate_limiter is not None else None
+        }
+
+    def _streams(self) -> dict:
+        if self.stream_times is None:
+            return {}
+        now = self.client.time_sync.server_time_ms()
+        return {name: {'last_event': last, 'lag_ms': max(0, now - last)}
+                for name, last in self.stream_times().items()}
+
+    def refresh_account(self):
+        """Fetch the account summary now"""
+        account_info = self.client.client.futures_account()
+        with self._lock:
+            self._account = {
+                'total_balance': account_info.get('totalWalletBalance'),
+                'available_balance': account_info.get('availableBalance'),
+                'account_type': account_info.get('accountType')
+            }
+            self._account_fetched = time.time()
+
+    def probe(self) -> dict:
+        """Run every probe now and cache the resulting report"""
+        ping = self._ping()
+        time_sync = self._time_sync()
+        rate_limit = self._rate_limit()
+        streams = self._streams()
+
+        issues = []
+        if not ping['ok']:
+            issues.append(f"Ping failed: {ping['error']}")
+        elif ping['latency_ms'] > self.max_latency_ms:
+            issues.append(f"Ping latency {ping['latency_ms']:.0f}ms")
+        if time_sync['stale']:
+            issues.append('Server time sync is stale')
+        if rate_limit['headroom'] is not None and rate_limit['headroom'] < self.min_weight_headroom:
+            issues.append(f"Request weight {rate_limit['used_weight_1m']}/{rate_limit['weight_limit_1m']}")
+        if self.max_stream_lag_ms is not None:
+            issues.extend(f"Stream {name} lagging {stream['lag_ms'] / 1000:.0f}s"
+                          for name, stream in streams.items()
+                          if stream['lag_ms'] > self.max_stream_lag_ms)
+
+        if ping['ok'] and time.time() - self._account_fetched >= self.account_interval:
+            try:
+                self.refresh_account()
+            except Exception as e:
+                issues.append(f"Account refresh failed: {e}")
+
+        if self.failures >= self.failures_before_down:
+            status = DOWN
+        elif issues:
+            status = DEGRADED
+        else:
+            status = OK
+
+        report = {
+            'status': status,
+            'checked_at': time.time(),
+            'issues': issues,
+            'ping': ping,
+            'time_sync': time_sync,
+            'rate_limit': rate_limit,
+            'streams': streams
+        }
+        with self._lock:
+            previous = self._report['status']
+            self._report = report
+        if status != previous:
+            logger.warning(f"Health changed from {previous} to {status}: {issues}")
+        return report
+
+    def report(self) -> dict:
+        """Latest cached report, with its age in seconds"""
+        with self._lock:
+            report = dict(self._report)
+        report['age_s'] = time.time() - report['checked_at'] if report['checked_at'] else None
+        return report
+
+    def account(self) -> dict:
+        """Cached account summary (None until the first successful refresh)"""
+        with self._lock:
+            return dict(self._account) if self._account is not None else None
+
+    def live(self) -> bool:
+        """The probe thread is running and has not stalled"""
+        report = self.report()
+        return self.running and (report['age_s'] is None or report['age_s'] < self.interval * 3)
+
+    def ready(self) -> bool:
+        """The exchange is reachable and the latest report is current"""
+        report = self.report()
+        return (report['status'] != DOWN and report['age_s'] is not None
+                and report['age_s'] < self.interval * 3)
+
+    def start(self):
+        """Start probing in a daemon thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.probe()
+            except Exception as e:
+                logger.error(f"Health probe failed: {e}")
+            self._stop.wait(self.interval)
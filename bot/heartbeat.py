@@ -0,0 +1,139 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Shortest countdown accepted, in seconds: shorter ones leave no room for a
+# late heartbeat and renew the countdown several times a second
+MIN_COUNTDOWN = 10.0
+
+
+class AutoCancelHeartbeat:
+    """
+    Keeps Binance's cancel-on-disconnect countdown armed for a set of symbols
+
+    A daemon thread renews the countdown every ``interval`` seconds. If the
+    process dies or loses connectivity, the countdown expires and Binance
+    cancels every open order on the watched symbols.
+    """
+
+    def __init__(self, order_manager, countdown: float = 60.0, interval: float = None):
+        """
+        Args:
+            order_manager: OrderManager used to send the countdown requests
+            countdown: Seconds without a heartbeat before orders are cancelled
+                (at least MIN_COUNTDOWN)
+            interval: Seconds between heartbeats (defaults to a third of countdown)
+
+        Raises:
+            ValueError: If the countdown is too short or the interval does not fit in it
+        """
+        self.order_manager = order_manager
+        self.last_error = None
+        self._symbols = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._check(countdown, interval)
+        self.countdown = countdown
+        self.interval = interval or countdown / 3
+
+    @staticmethod
+    def _check(countdown: float, interval: float = None):
+        if not MIN_COUNTDOWN <= countdown < float('inf'):
+            raise ValueError(f"Countdown must be at least {MIN_COUNTDOWN:g}s, got {countdown:g}s")
+        if interval is not None and not 0 < interval < countdown:
+            raise ValueError(f"Interval must be between 0 and the countdown ({countdown:g}s)")
+
+    @property
+    def symbols(self) -> list:
+        with self._lock:
+            return sorted(self._symbols)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_symbol(self, symbol: str):
+        """Watch a symbol, arming its countdown immediately"""
+        with self._lock:
+            self._symbols.add(symbol)
+        self.order_manager.set_auto_cancel(symbol, int(self.countdown * 1000))
+        self.start()
+
+    def remove_symbol(self, symbol: str):
+        """Stop watching a symbol and disarm its countdown"""
+        with self._lock:
+            self._symbols.discard(symbol)
+        self.order_manager.set_auto_cancel(symbol, 0)
+
+    def set_countdown(self, countdown: float, interval: float = None):
+        """
+        Change the countdown, re-arming the watched symbols with it at once
+
+        Raises:
+            ValueError: As for the constructor
+        """
+        self._check(countdown, interval)
+        self.countdown = countdown
+        self.interval = interval or countdown / 3
+        self.beat()
+        # Restart the thread's wait so the new interval applies immediately
+        self._wake.set()
+        logger.info(f"Auto-cancel countdown set to {countdown}s")
+
+    def beat(self):
+        """Renew the countdown for every watched symbol"""
+        countdown_ms = int(self.countdown * 1000)
+        for symbol in self.symbols:
+            try:
+                self.order_manager.set_auto_cancel(symbol, countdown_ms)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Auto-cancel heartbeat failed for {symbol}: {e}")
+
+    def start(self):
+        """Start the heartbeat thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='auto-cancel-heartbeat', daemon=True)
+        self._thread.start()
+        logger.info(f"Auto-cancel heartbeat started (countdown {self.countdown}s)")
+
+    def stop(self, disarm: bool = True):
+        """
+        Stop the heartbeat thread
+
+        Args:
+            disarm: Also cancel the countdowns, leaving open orders in place
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+        if disarm:
+            for symbol in self.symbols:
+                try:
+                    self.order_manager.set_auto_cancel(symbol, 0)
+                except Exception as e:
+                    logger.error(f"Failed to disarm auto-cancel for {symbol}: {e}")
+        logger.info("Auto-cancel heartbeat stopped")
+
+    def status(self) -> dict:
+        return {
+            'running': self.running,
+            'symbols': self.symbols,
+            'countdown': self.countdown,
+            'interval': self.interval,
+            'last_error': self.last_error
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._wake.wait(self.interval):
+                self._wake.clear()
+                continue
+            self.beat()
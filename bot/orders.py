@@ -1,17 +1,72 @@
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from .validators import OrderValidator
+from .retry import (RetryPolicy, RetryBudget, CircuitBreaker, make_client_order_id,
+                    is_retryable, is_ambiguous, ORDER_NOT_FOUND_CODE)
+from .risk import RiskEngine
 
 logger = logging.getLogger(__name__)
 
 class OrderManager:
     """Manages order placement and tracking"""
     
-    def __init__(self, client):
+    # Binance error code for "ClientOrderId is duplicated"
+    DUPLICATE_CLIENT_ORDER_ID_CODE = -4116
+    
+    # Binance error code for "Timestamp outside of recvWindow"
+    TIMESTAMP_ERROR_CODE = -1021
+    
+    # Maximum orders per batch cancel request
+    CANCEL_BATCH_SIZE = 10
+    
+    # Static parameters per order type, copied instead of rebuilt per order.
+    # RESULT responses carry executedQty / avgPrice (the default ACK does
+    # not), so fills are seen as soon as the order is placed.
+    ORDER_TEMPLATES = {
+        'MARKET': {'type': 'MARKET', 'newOrderRespType': 'RESULT'},
+        'LIMIT': {'type': 'LIMIT', 'timeInForce': 'GTC',  # Good Till Canceled
+                  'newOrderRespType': 'RESULT'},
+    }
+    
+    # Types python-binance routes to the algoOrder endpoint, which takes
+    # clientAlgoId instead of newClientOrderId
+    CONDITIONAL_TYPES = {'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET',
+                         'TRAILING_STOP_MARKET'}
+    
+    # Order statuses after which no further fills can arrive
+    FINAL_STATUSES = {'FILLED', 'CANCELED', 'EXPIRED', 'REJECTED', 'EXPIRED_IN_MATCH'}
+    
+    # Fill snapshots kept (least recently seen evicted first)
+    EXECUTED_CACHE_SIZE = 10000
+    
+    def __init__(self, client, retry_policy: RetryPolicy = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 retry_budget: RetryBudget = None,
+                 risk_engine: RiskEngine = None, account: str = 'default'):
         self.client = client
+        self.account = account
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.risk_engine = risk_engine
+        
+        # Callbacks receiving (account, fill) for every new fill seen; the
+        # risk engine is updated directly by track_fills()
+        self.fill_listeners = []
+        
+        # (symbol, orderId) -> (executed qty, avg price, final) already
+        # reported. Final orders stay cached so polling them again reports
+        # nothing new.
+        self._executed = OrderedDict()
+        self._executed_lock = threading.Lock()
     
     def place_order(self, symbol: str, side: str, order_type: str, 
-                   quantity: float, price: float = None, **kwargs):
+                   quantity: float, price: float = None,
+                   client_order_id: str = None, **kwargs):
         """
         Place an order on Binance Futures
         
@@ -21,6 +76,9 @@ class OrderManager:
             order_type: MARKET or LIMIT
             quantity: Order quantity
             price: Required for LIMIT orders
+            client_order_id: Idempotency key sent as newClientOrderId, or
+                clientAlgoId for conditional types (derived from the order
+                parameters when omitted)
             **kwargs: Additional order parameters
         
         Returns:
@@ -32,7 +90,8 @@ class OrderManager:
         
         try:
             # Validate inputs
-            if not OrderValidator.validate_symbol(symbol):
+            # Unknown symbols fail against the cached listing before any order request
+            if not OrderValidator.validate_symbol(symbol, self.client.tradable_symbols()):
                 raise ValueError(f"Invalid symbol: {symbol}")
             
             if not OrderValidator.validate_side(side):
@@ -48,12 +107,11 @@ class OrderManager:
                 raise ValueError(f"Invalid quantity: {quantity}")
             
             # Prepare order parameters
-            order_params = {
-                'symbol': symbol,
-                'side': side.upper(),
-                'type': order_type.upper(),
-                'quantity': quantity
-            }
+            order_params = dict(self.ORDER_TEMPLATES.get(order_type.upper(),
+                                                         {'type': order_type.upper()}))
+            order_params['symbol'] = symbol
+            order_params['side'] = side.upper()
+            order_params['quantity'] = quantity
             
             # Add price for LIMIT orders
             if order_type.upper() == 'LIMIT':
@@ -64,17 +122,42 @@ class OrderManager:
                     raise ValueError(f"Invalid price: {price}")
                 
                 order_params['price'] = price
-                order_params['timeInForce'] = 'GTC'  # Good Till Canceled
             
             # Add any additional parameters
             order_params.update(kwargs)
             
+            # Same id on every attempt so a retried order cannot be duplicated
+            if client_order_id is None:
+                client_order_id = make_client_order_id(
+                    symbol, side, order_type, quantity, price, nonce=time.time_ns()
+                )
+            conditional = order_type.upper() in self.CONDITIONAL_TYPES
+            if conditional:
+                order_params['clientAlgoId'] = client_order_id
+            else:
+                order_params['newClientOrderId'] = client_order_id
+            
+            # Pre-trade risk checks against the in-memory exposure index. The
+            # order is reserved as open quantity until its snapshots settle it
+            # (conditional orders do not rest on the book, so are not reserved)
+            reservation = None if conditional else client_order_id
+            if self.risk_engine is not None:
+                self.risk_engine.check(self.account, symbol, side, quantity, price,
+                                       reservation=reservation)
+            
             # Place the order
-            response = self.client.client.futures_create_order(**order_params)
+            try:
+                response = self._submit_order(order_params)
+            except Exception:
+                if self.risk_engine is not None and reservation is not None:
+                    self.risk_engine.release(self.account, symbol, reservation)
+                raise
             
             # Log successful order
             logger.info(f"Order placed successfully: {response}")
             
+            self.track_fills(response)
+            
             return response
             
         except BinanceAPIException as e:
@@ -87,6 +170,96 @@ class OrderManager:
             logger.error(f"Unexpected error placing order: {e}")
             raise
     
+    def _submit_order(self, order_params: dict):
+        """
+        Send an order, retrying transient failures without duplicating it
+
+        After an ambiguous failure (timeout, 5xx, unknown execution status)
+        the order is looked up by clientOrderId before being resent.
+        """
+        symbol = order_params['symbol']
+        conditional = 'clientAlgoId' in order_params
+        client_order_id = order_params['clientAlgoId' if conditional else 'newClientOrderId']
+        self.retry_budget.record_request()
+        
+        attempt = 1
+        ambiguous = False
+        while True:
+            self.circuit_breaker.before_request()
+            try:
+                if ambiguous:
+                    existing = self._find_order(symbol, client_order_id, conditional)
+                    if existing is not None:
+                        logger.info(f"Order {client_order_id} found after ambiguous failure")
+                        self.circuit_breaker.record_success()
+                        return existing
+                
+                response = self.client.client.futures_create_order(**order_params)
+                self.circuit_breaker.record_success()
+                return response
+                
+            except BinanceAPIException as e:
+                if e.code == self.DUPLICATE_CLIENT_ORDER_ID_CODE:
+                    # An earlier attempt landed after all
+                    self.circuit_breaker.record_success()
+                    existing = self._find_order(symbol, client_order_id, conditional)
+                    if existing is not None:
+                        return existing
+                    raise
+                error = e
+            except Exception as e:
+                error = e
+            
+            if not is_retryable(error):
+                # The exchange answered, so it is healthy even if it refused
+                if isinstance(error, BinanceAPIException):
+                    self.circuit_breaker.record_success()
+                else:
+                    self.circuit_breaker.record_error()
+                raise error
+            
+            self.circuit_breaker.record_failure()
+            ambiguous = ambiguous or is_ambiguous(error)
+            
+            # Clock drift: resync before the retry instead of failing again
+            time_sync = getattr(self.client, 'time_sync', None)
+            if (time_sync is not None and isinstance(error, BinanceAPIException)
+                    and error.code == self.TIMESTAMP_ERROR_CODE):
+                try:
+                    time_sync.sync()
+                except Exception as e:
+                    logger.warning(f"Server time resync failed: {e}")
+            
+            if attempt >= self.retry_policy.max_attempts:
+                logger.error(f"Giving up on order {client_order_id} after {attempt} attempts")
+                raise error
+            if not self.retry_budget.try_spend():
+                logger.error(f"Retry budget exhausted, not retrying order {client_order_id}")
+                raise error
+            
+            delay = self.retry_policy.delay(attempt)
+            logger.warning(f"Order {client_order_id} attempt {attempt} failed ({error}), "
+                           f"retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+    
+    def find_order(self, symbol: str, client_order_id: str):
+        """Look up an order by clientOrderId, returning None if it was never placed"""
+        return self._find_order(symbol, client_order_id)
+    
+    def _find_order(self, symbol: str, client_order_id: str, conditional: bool = False):
+        """Look up an order by client id, returning None if it does not exist"""
+        if conditional:
+            lookup = {'clientAlgoId': client_order_id}
+        else:
+            lookup = {'origClientOrderId': client_order_id}
+        try:
+            return self.client.client.futures_get_order(symbol=symbol, **lookup)
+        except BinanceAPIException as e:
+            if e.code == ORDER_NOT_FOUND_CODE:
+                return None
+            raise
+    
     def get_order_status(self, symbol: str, order_id: int):
         """Get status of a specific order"""
         try:
@@ -95,11 +268,71 @@ class OrderManager:
                 orderId=order_id
             )
             logger.info(f"Order status retrieved: {order_id}")
+            self.track_fills(order_status)
             return order_status
         except BinanceAPIException as e:
             logger.error(f"Failed to get order status: {e}")
             raise
     
+    def track_fills(self, order: dict):
+        """
+        Report any quantity executed since the order was last seen
+        
+        Order responses carry cumulative executedQty / avgPrice, so the new
+        fill is the difference from the previous snapshot of the same order.
+        The quantity still resting on the book is passed to the risk engine.
+        """
+        if not order or 'orderId' not in order:
+            return
+        
+        key = (order['symbol'], order['orderId'])
+        executed = float(order.get('executedQty') or 0)
+        avg_price = float(order.get('avgPrice') or 0)
+        final = order.get('status') in self.FINAL_STATUSES
+        fill_price = None
+        
+        # Compare and update atomically: concurrent polls of one order
+        # (API and algo threads) must not both report the same fill
+        with self._executed_lock:
+            previous_qty, previous_avg, was_final = self._executed.get(key, (0.0, 0.0, False))
+            fill_qty = executed - previous_qty
+            # Snapshots older than one already seen change nothing
+            current = not was_final and fill_qty > -1e-12
+            if current:
+                self._executed[key] = (max(executed, previous_qty),
+                                       avg_price if fill_qty > 1e-12 else previous_avg, final)
+            if key in self._executed:
+                self._executed.move_to_end(key)
+                if len(self._executed) > self.EXECUTED_CACHE_SIZE:
+                    self._executed.popitem(last=False)
+            if fill_qty > 1e-12:
+                fill_price = (avg_price * executed - previous_avg * previous_qty) / fill_qty
+            if current and self.risk_engine is not None:
+                # Reserved under clientOrderId by place_order()
+                remaining = 0.0 if final else float(order.get('origQty') or 0) - executed
+                self.risk_engine.on_order(self.account, order['symbol'],
+                                          order.get('clientOrderId') or order['orderId'],
+                                          order['side'], remaining,
+                                          filled=fill_qty if fill_price is not None else 0.0,
+                                          price=fill_price)
+        
+        if fill_price is None:
+            return
+        
+        fill = {
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'quantity': fill_qty,
+            'price': fill_price,
+            'order_id': order['orderId'],
+            'time': order.get('updateTime')
+        }
+        for listener in self.fill_listeners:
+            try:
+                listener(self.account, fill)
+            except Exception as e:
+                logger.error(f"Fill listener failed: {e}")
+    
     def cancel_order(self, symbol: str, order_id: int):
         """Cancel an existing order"""
         try:
@@ -108,7 +341,93 @@ class OrderManager:
                 orderId=order_id
             )
             logger.info(f"Order cancelled: {order_id}")
+            self.track_fills(response)
             return response
         except BinanceAPIException as e:
             logger.error(f"Failed to cancel order: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def cancel_orders(self, symbol: str, order_ids: list):
+        """
+        Cancel several orders on one symbol using the batch cancel endpoint
+        
+        Args:
+            symbol: Trading pair
+            order_ids: Order ids to cancel
+        
+        Returns:
+            list: One entry per order id, either the cancelled order or
+                Binance's error object for that order
+        """
+        results = []
+        for start in range(0, len(order_ids), self.CANCEL_BATCH_SIZE):
+            chunk = [int(order_id) for order_id in order_ids[start:start + self.CANCEL_BATCH_SIZE]]
+            try:
+                results.extend(self.client.client.futures_cancel_orders(
+                    symbol=symbol,
+                    orderidlist=chunk
+                ))
+            except BinanceAPIException as e:
+                logger.error(f"Failed to cancel orders {chunk}: {e}")
+                raise
+        for result in results:
+            self.track_fills(result)
+        logger.info(f"Batch cancel on {symbol}: {len(order_ids)} orders")
+        return results
+    
+    def cancel_all(self, symbol: str):
+        """Cancel all open orders on a symbol"""
+        try:
+            response = self.client.client.futures_cancel_all_open_orders(symbol=symbol)
+            logger.info(f"All open orders cancelled on {symbol}")
+            if self.risk_engine is not None:
+                self.risk_engine.clear_orders(self.account, symbol)
+            return response
+        except BinanceAPIException as e:
+            logger.error(f"Failed to cancel all orders on {symbol}: {e}")
+            raise
+    
+    def cancel_all_symbols(self, symbols: list = None, max_workers: int = 8):
+        """
+        Cancel all open orders on several symbols concurrently
+        
+        Args:
+            symbols: Symbols to flatten (defaults to every symbol with open orders)
+            max_workers: Concurrent cancel requests
+        
+        Returns:
+            dict: symbol -> cancel response, or {'error': message} on failure
+        """
+        if symbols is None:
+            open_orders = self.client.client.futures_get_open_orders()
+            symbols = sorted({order['symbol'] for order in open_orders})
+        
+        if not symbols:
+            return {}
+        
+        def cancel(symbol):
+            try:
+                return symbol, self.cancel_all(symbol)
+            except Exception as e:
+                return symbol, {'error': str(e)}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            return dict(executor.map(cancel, symbols))
+    
+    def set_auto_cancel(self, symbol: str, countdown_ms: int):
+        """
+        Arm (or with 0, disarm) Binance's auto-cancel countdown for a symbol
+        
+        All open orders on the symbol are cancelled if the countdown is not
+        renewed within ``countdown_ms`` milliseconds.
+        """
+        try:
+            response = self.client.client.futures_countdown_cancel_all(
+                symbol=symbol,
+                countdownTime=countdown_ms
+            )
+            logger.debug(f"Auto-cancel countdown for {symbol} set to {countdown_ms}ms")
+            return response
+        except BinanceAPIException as e:
+            logger.error(f"Failed to set auto-cancel for {symbol}: {e}")
+            raise
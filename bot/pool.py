@@ -0,0 +1,276 @@
+import bisect
+import hashlib
+import logging
+import os
+import threading
+
+from .analytics import AnalyticsEngine
+from .client import BinanceFuturesClient
+from .orders import OrderManager
+from .ratelimit import RateLimiter, ip_rate_limiter
+from .risk import RiskEngine, RiskLimits
+from .vault import CredentialVault
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT = 'default'
+
+
+def load_accounts_from_env() -> dict:
+    """
+    Read account credentials from environment variables
+
+    The default account uses BINANCE_API_KEY / BINANCE_API_SECRET. Extra
+    accounts are listed in BINANCE_ACCOUNTS (comma separated) and use
+    BINANCE_API_KEY_<NAME> / BINANCE_API_SECRET_<NAME>.
+
+    Returns:
+        dict: account name -> (api_key, api_secret)
+    """
+    accounts = {}
+
+    api_key = os.getenv('BINANCE_API_KEY')
+    api_secret = os.getenv('BINANCE_API_SECRET')
+    if api_key and api_secret:
+        accounts[DEFAULT_ACCOUNT] = (api_key, api_secret)
+
+    for name in os.getenv('BINANCE_ACCOUNTS', '').split(','):
+        name = name.strip()
+        if not name:
+            continue
+        suffix = name.upper().replace('-', '_')
+        api_key = os.getenv(f'BINANCE_API_KEY_{suffix}')
+        api_secret = os.getenv(f'BINANCE_API_SECRET_{suffix}')
+        if api_key and api_secret:
+            accounts[name] = (api_key, api_secret)
+        else:
+            logger.warning(f"Credentials missing for account {name}")
+
+    return accounts
+
+
+class HashRing:
+    """Consistent hash ring mapping account names to worker shards"""
+
+    def __init__(self, shards: int, replicas: int = 100):
+        """
+        Args:
+            shards: Number of worker shards
+            replicas: Virtual nodes per shard (smooths the distribution)
+        """
+        self.shards = shards
+        ring = []
+        for shard in range(shards):
+            for replica in range(replicas):
+                ring.append((self._hash(f"{shard}:{replica}"), shard))
+        ring.sort()
+        self._keys = [key for key, _ in ring]
+        self._shards = [shard for _, shard in ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def shard_for(self, account: str) -> int:
+        """Return the shard index owning ``account``"""
+        index = bisect.bisect(self._keys, self._hash(account)) % len(self._keys)
+        return self._shards[index]
+
+
+class ClientPool:
+    """
+    Per-account Binance clients for a single worker process
+
+    Each account gets its own client (and so its own HTTP connection pool),
+    rate limiter, exchange info cache, OrderManager and AnalyticsEngine, so a
+    busy account cannot throttle the others. Clients are created lazily on
+    first use.
+    """
+
+    def __init__(self, accounts: dict = None, testnet: bool = True,
+                 shard: int = 0, shards: int = 1, pool_size: int = 10,
+                 rate_limit: float = 2000, risk_engine: RiskEngine = None,
+                 analytics_dir: str = None, vault: CredentialVault = None,
+                 ip_rate_limit: float = 2000, rate_limit_timeout: float = 5.0):
+        """
+        Args:
+            accounts: account name -> (api_key, api_secret)
+            testnet: Use testnet for all accounts
+            shard: Index of this worker's shard
+            shards: Total number of worker shards
+            pool_size: HTTP connections kept per account
+            rate_limit: Request weight per minute allowed per account
+            risk_engine: Pre-trade risk engine shared by all accounts
+            analytics_dir: Directory for per-account analytics state
+                (None keeps analytics in memory only)
+            vault: Credential store; its accounts override ``accounts`` and
+                changes to its file are applied without a restart
+            ip_rate_limit: Request weight per minute for all accounts together,
+                Binance's per-IP limit (split evenly between the worker shards)
+            rate_limit_timeout: Longest a request waits for weight before it
+                fails with RateLimitTimeout
+        """
+        self.testnet = testnet
+        self.shard = shard
+        self.ring = HashRing(shards)
+        self.pool_size = pool_size
+        self.rate_limit = rate_limit
+        self.ip_rate_limiter = ip_rate_limiter(ip_rate_limit / shards)
+        self.rate_limit_timeout = rate_limit_timeout
+        self.risk_engine = risk_engine or RiskEngine()
+        self.analytics_dir = analytics_dir
+        self._credentials = dict(accounts or {})
+        self._entries = {}
+        self._lock = threading.Lock()
+        # account -> lock held while its client is built
+        self._creating = {}
+        self.vault = vault
+        # Accounts last read from the vault, to notice ones removed from it
+        self._vault_accounts = set()
+        if vault is not None:
+            vault_accounts = vault.accounts()
+            self._credentials.update(vault_accounts)
+            self._vault_accounts = set(vault_accounts)
+            vault.watch(self.reload_credentials)
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from environment variables (see load_accounts_from_env)"""
+        return cls(
+            accounts=load_accounts_from_env(),
+            shard=int(os.getenv('WORKER_ID', 0)),
+            shards=int(os.getenv('WORKER_COUNT', 1)),
+            rate_limit=float(os.getenv('BINANCE_WEIGHT_LIMIT', 2000)),
+            ip_rate_limit=float(os.getenv('BINANCE_IP_WEIGHT_LIMIT', 2000)),
+            rate_limit_timeout=float(os.getenv('BINANCE_RATE_LIMIT_TIMEOUT', 5.0)),
+            risk_engine=RiskEngine(RiskLimits.from_env()),
+            analytics_dir=os.getenv('ANALYTICS_DIR', 'data/analytics'),
+            vault=CredentialVault.from_env(),
+        )
+
+    def owns(self, account: str) -> bool:
+        """Check whether this worker's shard serves ``account``"""
+        return self.ring.shard_for(account) == self.shard
+
+    def accounts(self) -> list:
+        """Names of all configured accounts"""
+        return sorted(self._credentials)
+
+    def credentials(self, account: str):
+        """(api_key, api_secret) for an account, or None"""
+        return self._credentials.get(account)
+
+    def set_credentials(self, account: str, api_key: str, api_secret: str, persist: bool = True):
+        """
+        Add or rotate an account's credentials
+
+        A running client swaps keys in place, keeping its connection pool,
+        caches and OrderManager; requests in flight finish with the old key.
+
+        Args:
+            account: Account name
+            api_key: New API key
+            api_secret: New API secret
+            persist: Also save the credentials to the vault, if there is one
+        """
+        with self._lock:
+            self._credentials[account] = (api_key, api_secret)
+            entry = self._entries.get(account)
+            if entry is not None:
+                entry[0].set_credentials(api_key, api_secret)
+        if persist and self.vault is not None:
+            self.vault.set(account, api_key, api_secret)
+        logger.info(f"Credentials updated for account {account}")
+
+    def remove_account(self, account: str):
+        """Forget an account's credentials and stop its client's background work"""
+        with self._lock:
+            self._credentials.pop(account, None)
+            entry = self._entries.pop(account, None)
+        if entry is not None:
+            client, _, analytics = entry
+            analytics.stop()
+            client.time_sync.stop()
+        logger.info(f"Account {account} removed")
+
+    def reload_credentials(self, accounts: dict = None):
+        """Apply credentials changed in the vault (called by its file watcher)"""
+        accounts = self.vault.accounts() if accounts is None else accounts
+        for account, (api_key, api_secret) in accounts.items():
+            if self._credentials.get(account) != (api_key, api_secret):
+                self.set_credentials(account, api_key, api_secret, persist=False)
+        for account in self._vault_accounts - set(accounts):
+            self.remove_account(account)
+        self._vault_accounts = set(accounts)
+
+    def _entry(self, account: str):
+        entry = self._entries.get(account)
+        if entry is not None:
+            return entry
+
+        # Build under a per-account lock, so a slow client start for one
+        # account never blocks requests for the others
+        with self._lock:
+            if account not in self._credentials:
+                return None
+            creating = self._creating.setdefault(account, threading.Lock())
+
+        with creating:
+            entry = self._entries.get(account)
+            if entry is not None:
+                return entry
+            with self._lock:
+                credentials = self._credentials.get(account)
+            if credentials is None:
+                return None
+
+            api_key, api_secret = credentials
+            client = BinanceFuturesClient(
+                api_key, api_secret, testnet=self.testnet,
+                pool_size=self.pool_size,
+                rate_limiter=RateLimiter(self.rate_limit),
+                ip_rate_limiter=self.ip_rate_limiter,
+                rate_limit_timeout=self.rate_limit_timeout
+            )
+            order_manager = OrderManager(client, risk_engine=self.risk_engine, account=account)
+            analytics = AnalyticsEngine(
+                os.path.join(self.analytics_dir, f"{account}.json") if self.analytics_dir else None
+            )
+            order_manager.fill_listeners.append(analytics.on_fill)
+            entry = (client, order_manager, analytics)
+            with self._lock:
+                current = self._credentials.get(account)
+                if current is not None:
+                    # Keys rotated while the client was being built
+                    if current != credentials:
+                        client.set_credentials(*current)
+                    self._entries[account] = entry
+            if current is None:
+                # Removed while the client was being built
+                client.time_sync.stop()
+                return None
+            # Commission and funding are not in order responses: poll them
+            analytics.start(client.client)
+            logger.info(f"Client created for account {account}")
+
+        # Seed the exposure index once; fills keep it current afterwards
+        try:
+            self.risk_engine.sync_positions(account, client.client.futures_position_information())
+        except Exception as e:
+            logger.warning(f"Could not sync positions for {account}: {e}")
+        return entry
+
+    def get_client(self, account: str = DEFAULT_ACCOUNT):
+        """Return the account's BinanceFuturesClient, or None if it is not configured"""
+        entry = self._entry(account)
+        return entry[0] if entry else None
+
+    def get_order_manager(self, account: str = DEFAULT_ACCOUNT):
+        """Return the account's OrderManager, or None if it is not configured"""
+        entry = self._entry(account)
+        return entry[1] if entry else None
+
+    def get_analytics(self, account: str = DEFAULT_ACCOUNT):
+        """Return the account's AnalyticsEngine, or None if it is not configured"""
+        entry = self._entry(account)
+        return entry[2] if entry else None
@@ -0,0 +1,123 @@
+import threading
+import time
+
+# Request weight of futures endpoints, from Binance's USD-M API docs. Values
+# are (weight with a symbol, weight without one); endpoints not listed cost 1.
+FUTURES_WEIGHTS = {
+    'ticker/24hr': (1, 40),
+    'ticker/price': (1, 2),
+    'ticker/bookTicker': (2, 5),
+    'premiumIndex': (1, 10),
+    'openOrders': (1, 40),
+    'openAlgoOrders': (1, 40),
+    'account': (5, 5),
+    'balance': (5, 5),
+    'positionRisk': (5, 5),
+    'allOrders': (5, 5),
+    'allAlgoOrders': (5, 5),
+    'userTrades': (5, 5),
+    'trades': (5, 5),
+    'historicalTrades': (20, 20),
+    'income': (30, 30),
+    'countdownCancelAll': (10, 10),
+}
+
+# depth / klines cost more for deeper books and longer ranges: (limit up to, weight)
+LIMIT_WEIGHTS = {
+    'depth': ((50, 2), (100, 5), (500, 10), (1000, 20)),
+    'klines': ((99, 1), (499, 2), (1000, 5), (1500, 10)),
+}
+
+
+def futures_weight(method: str, path: str, params: dict = None) -> int:
+    """Request weight Binance charges for a futures REST call"""
+    params = params or {}
+    if path == 'batchOrders' and method.upper() == 'POST':
+        return 5
+    if path in LIMIT_WEIGHTS:
+        steps = LIMIT_WEIGHTS[path]
+        limit = int(params.get('limit') or 500)
+        return next((weight for upto, weight in steps if limit <= upto), steps[-1][1])
+    with_symbol, without_symbol = FUTURES_WEIGHTS.get(path, (1, 1))
+    return with_symbol if params.get('symbol') else without_symbol
+
+
+class RateLimitTimeout(Exception):
+    """Raised when request weight did not become available in time"""
+    pass
+
+
+class RateLimiter:
+    """
+    Token bucket limiting request weight per account
+
+    Binance futures allows 2400 request weight per minute per IP/account;
+    the default keeps a margin below that.
+    """
+
+    def __init__(self, rate: float = 2000, per: float = 60.0, burst: float = None):
+        """
+        Args:
+            rate: Weight allowed per ``per`` seconds
+            per: Window length in seconds
+            burst: Bucket capacity (defaults to ``rate / 10``)
+        """
+        self.fill_rate = rate / per
+        self.capacity = burst if burst is not None else max(1.0, rate / 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+
+    def acquire(self, weight: float = 1, timeout: float = None) -> bool:
+        """
+        Block until ``weight`` tokens are available
+
+        Returns:
+            bool: False if ``timeout`` expired before tokens were available
+        """
+        # A request heavier than the bucket would otherwise wait forever
+        weight = min(weight, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return True
+                wait = (weight - self._tokens) / self.fill_rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+_ip_rate_limiter = None
+_ip_rate_limiter_lock = threading.Lock()
+
+
+def ip_rate_limiter(rate: float = 2000) -> RateLimiter:
+    """
+    Process-wide limiter for the request weight Binance counts per IP
+
+    Every account's client in the process shares it, on top of its own
+    per-account limiter. ``rate`` applies to the first call only.
+    """
+    global _ip_rate_limiter
+    with _ip_rate_limiter_lock:
+        if _ip_rate_limiter is None:
+            _ip_rate_limiter = RateLimiter(rate)
+        return _ip_rate_limiter
@@ -0,0 +1,432 @@
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # Optional: enables the zero-copy reader
+    np = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: enables compressed day files
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Streams recorded per symbol, with what the four value columns hold
+STREAMS = {
+    'trades': (1, ('price', 'qty', 'side', 'trade_id')),       # side: 1 buyer aggressor, -1 seller
+    'book': (2, ('bid', 'bid_qty', 'ask', 'ask_qty')),
+    'mark': (3, ('mark', 'index', 'funding_rate', 'next_funding_time')),
+}
+
+MAGIC = b'TBTK'
+VERSION = 1
+HEADER = struct.Struct('<4sHHB7x')          # magic, version, record size, stream code
+RECORD = struct.Struct('<q4d')              # timestamp ms, four float64 values
+INDEX = struct.Struct('<qq')                # timestamp ms, record number
+INDEX_EVERY = 1024                          # records between timestamp index entries
+BLOCK_RECORDS = 8192                        # records per zstd block
+DAY_MS = 86_400_000
+
+if np is not None:
+    TICK_DTYPE = np.dtype([('ts', '<i8'), ('a', '<f8'), ('b', '<f8'), ('c', '<f8'), ('d', '<f8')])
+
+
+def _day(timestamp_ms: int) -> str:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime('%Y%m%d')
+
+
+def tick_path(root: str, symbol: str, stream: str, day: str) -> str:
+    """Path of a raw day file: <root>/<SYMBOL>/<YYYYMMDD>.<stream>.ticks"""
+    return os.path.join(root, symbol, f"{day}.{stream}.ticks")
+
+
+class _Stream:
+    """Open day file of one (stream, symbol) with its write buffer"""
+
+    def __init__(self, root: str, stream: str, symbol: str):
+        self.root = root
+        self.stream = stream
+        self.symbol = symbol
+        self.buffer = bytearray()
+        self.index = bytearray()
+        self.file = None
+        self.index_file = None
+        self.day_start = 0
+        self.day_end = 0
+        self.count = 0
+        self.last_ts = -1
+        self.last_trade_id = -1.0
+
+    def open(self, timestamp_ms: int):
+        """Switch to the day file containing ``timestamp_ms``; return the closed path"""
+        closed = self.close()
+        self.day_start = timestamp_ms - timestamp_ms % DAY_MS
+        self.day_end = self.day_start + DAY_MS
+        path = tick_path(self.root, self.symbol, self.stream, _day(self.day_start))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, STREAMS[self.stream][0]))
+        self.count = (self.file.tell() - HEADER.size) // RECORD.size
+        if self.count:
+            # Reopened after a restart: continue from the last record on disk
+            with open(path, 'rb') as f:
+                f.seek(HEADER.size + (self.count - 1) * RECORD.size)
+                self.last_ts, _, _, _, trade_id = RECORD.unpack(f.read(RECORD.size))
+            if self.stream == 'trades':
+                self.last_trade_id = max(self.last_trade_id, trade_id)
+        self.index_file = open(path[:-len('.ticks')] + '.idx', 'ab')
+        return closed
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer.clear()
+        if self.index:
+            self.index_file.write(self.index)
+            self.index_file.flush()
+            self.index.clear()
+
+    def close(self):
+        if self.file is None:
+            return None
+        self.flush()
+        path = self.file.name
+        self.file.close()
+        self.index_file.close()
+        self.file = self.index_file = None
+        return path
+
+
+class TickRecorder:
+    """
+    Append-only recorder for market data ticks
+
+    Every (symbol, stream, UTC day) gets a file of fixed-width records
+    (int64 timestamp + four float64 values) behind a 16-byte header, so a
+    day can be memory-mapped and sliced without parsing. A sparse
+    timestamp index (every INDEX_EVERY records) sits next to it in .idx.
+
+    Timestamps are kept non-decreasing per stream: stale or repeated ticks
+    (e.g. the same recent trades fetched twice) are dropped on write.
+    Records are buffered and written in large appends by flush().
+    """
+
+    def __init__(self, root: str = 'data/ticks', flush_bytes: int = 1 << 20,
+                 flush_interval: float = 1.0, compress_closed: bool = False):
+        """
+        Args:
+            root: Directory holding the tick files
+            flush_bytes: Buffered bytes per stream that trigger a write
+            flush_interval: Seconds between background flushes (see start())
+            compress_closed: Compress day files with zstd when a day rolls over
+        """
+        if compress_closed and zstandard is None:
+            raise RuntimeError('compress_closed requires the zstandard package')
+        self.root = root
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.compress_closed = compress_closed
+        self.recorded = 0
+        self.dropped = 0
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stream(self, stream: str, symbol: str) -> _Stream:
+        state = self._streams.get((stream, symbol))
+        if state is None:
+            if stream not in STREAMS:
+                raise ValueError(f"Unknown stream: {stream}")
+            state = self._streams[(stream, symbol)] = _Stream(self.root, stream, symbol)
+        return state
+
+    def _rolled(self, path: str):
+        if path and self.compress_closed:
+            threading.Thread(target=compress_file, args=(path,), daemon=True).start()
+
+    def _append(self, state: _Stream, rows):
+        # Caller holds self._lock
+        pack = RECORD.pack
+        buffer = state.buffer
+        last_ts = state.last_ts
+        count = state.count
+        written = dropped = 0
+        for row in rows:
+            ts = row[0]
+            if ts < last_ts:
+                dropped += 1
+                continue
+            if ts >= state.day_end:
+                self._rolled(state.open(ts))
+                count = state.count
+                if ts < state.last_ts:
+                    dropped += 1
+                    continue
+                last_ts = state.last_ts
+            if count % INDEX_EVERY == 0:
+                state.index += INDEX.pack(ts, count)
+            buffer += pack(*row)
+            last_ts = ts
+            count += 1
+            written += 1
+        state.last_ts = last_ts
+        state.count = count
+        self.recorded += written
+        self.dropped += dropped
+        if len(buffer) >= self.flush_bytes:
+            state.flush()
+
+    def record_many(self, stream: str, symbol: str, rows):
+        """
+        Append ticks to a stream
+
+        Args:
+            stream: 'trades', 'book' or 'mark'
+            symbol: Trading pair symbol
+            rows: Iterable of (timestamp_ms, a, b, c, d) in time order
+        """
+        with self._lock:
+            self._append(self._stream(stream, symbol), rows)
+
+    def record(self, stream: str, symbol: str, timestamp_ms: int,
+               a: float, b: float = 0.0, c: float = 0.0, d: float = 0.0):
+        """Append a single tick (prefer record_many for bulk data)"""
+        self.record_many(stream, symbol, ((timestamp_ms, a, b, c, d),))
+
+    def record_trades(self, symbol: str, trades: list):
+        """Record futures_recent_trades() rows, skipping trades already seen"""
+        with self._lock:
+            state = self._stream('trades', symbol)
+            last_id = state.last_trade_id
+            rows = []
+            for trade in sorted(trades, key=lambda t: t['id']):
+                if trade['id'] <= last_id:
+                    continue
+                rows.append((trade['time'], float(trade['price']), float(trade['qty']),
+                             -1.0 if trade.get('isBuyerMaker') else 1.0, float(trade['id'])))
+                last_id = trade['id']
+            state.last_trade_id = last_id
+            self._append(state, rows)
+
+    def record_book_top(self, symbol: str, depth: dict):
+        """Record the best bid/ask of a futures_order_book() response"""
+        if not depth.get('bids') or not depth.get('asks'):
+            return
+        bid, bid_qty = depth['bids'][0]
+        ask, ask_qty = depth['asks'][0]
+        timestamp = depth.get('T') or depth.get('E') or int(time.time() * 1000)
+        self.record('book', symbol, timestamp, float(bid), float(bid_qty), float(ask), float(ask_qty))
+
+    def record_mark_prices(self, marks: list):
+        """Record futures_mark_price() rows (premiumIndex)"""
+        now = int(time.time() * 1000)
+        for mark in marks:
+            self.record('mark', mark['symbol'], mark.get('time') or now,
+                        float(mark['markPrice']), float(mark.get('indexPrice') or 0),
+                        float(mark.get('lastFundingRate') or 0), float(mark.get('nextFundingTime') or 0))
+
+    def flush(self):
+        """Write all buffered ticks to disk"""
+        with self._lock:
+            for state in self._streams.values():
+                if state.file is not None:
+                    state.flush()
+
+    def start(self):
+        """Flush in a background thread every flush_interval seconds"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-recorder', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Tick flush failed: {e}")
+
+    def stop(self):
+        """Stop the flush thread and close all files"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for state in self._streams.values():
+                state.close()
+            self._streams.clear()
+
+    def last_event_times(self) -> dict:
+        """Timestamp (ms) of the newest tick per '<stream>:<symbol>'"""
+        with self._lock:
+            return {f"{stream}:{symbol}": state.last_ts
+                    for (stream, symbol), state in self._streams.items() if state.last_ts >= 0}
+
+    def stats(self) -> dict:
+        return {
+            'root': self.root,
+            'streams': len(self._streams),
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'buffered': sum(len(state.buffer) for state in self._streams.values()) // RECORD.size
+        }
+
+
+def compress_file(path: str, level: int = 3) -> str:
+    """
+    Compress a closed raw day file into <path>.zst
+
+    The output is the original header, then zstd-compressed blocks of
+    BLOCK_RECORDS records, then a block index of (first timestamp, offset,
+    length) entries and an 8-byte pointer to that index. The raw file and
+    its .idx are removed once the compressed file is in place.
+    """
+    if zstandard is None:
+        raise RuntimeError('Compressing tick files requires the zstandard package')
+    compressor = zstandard.ZstdCompressor(level=level)
+    block_size = BLOCK_RECORDS * RECORD.size
+    blocks = []
+    tmp_path = f"{path}.zst.tmp"
+
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        dst.write(src.read(HEADER.size))
+        while True:
+            raw = src.read(block_size)
+            if not raw:
+                break
+            data = compressor.compress(raw)
+            blocks.append((RECORD.unpack_from(raw)[0], dst.tell(), len(data)))
+            dst.write(data)
+        index_offset = dst.tell()
+        for entry in blocks:
+            dst.write(struct.pack('<qqq', *entry))
+        dst.write(struct.pack('<q', index_offset))
+
+    os.replace(tmp_path, f"{path}.zst")
+    os.remove(path)
+    index_path = path[:-len('.ticks')] + '.idx'
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    logger.info(f"Compressed {path} into {len(blocks)} blocks")
+    return f"{path}.zst"
+
+
+class TickReader:
+    """
+    Reader for files written by TickRecorder
+
+    With NumPy, read() returns a structured array (ts, a, b, c, d; see
+    STREAMS for the column meaning) that is a view on a memory map of the
+    raw file, so nothing is copied until the data is used. Without NumPy
+    it returns a list of (ts, a, b, c, d) tuples.
+    """
+
+    def __init__(self, root: str = 'data/ticks'):
+        self.root = root
+
+    def days(self, symbol: str, stream: str) -> list:
+        """Recorded days (YYYYMMDD) for a symbol and stream"""
+        directory = os.path.join(self.root, symbol)
+        if not os.path.isdir(directory):
+            return []
+        suffixes = (f".{stream}.ticks", f".{stream}.ticks.zst")
+        return sorted({name.split('.')[0] for name in os.listdir(directory) if name.endswith(suffixes)})
+
+    def read(self, symbol: str, stream: str, day: str, start: int = None, end: int = None):
+        """
+        Ticks of one day, optionally limited to start <= ts < end
+
+        Args:
+            symbol: Trading pair symbol
+            stream: 'trades', 'book' or 'mark'
+            day: UTC day as YYYYMMDD
+            start: First timestamp (ms) to include
+            end: Timestamp (ms) to stop before
+        """
+        path = tick_path(self.root, symbol, stream, day)
+        if os.path.exists(path):
+            return self._read_raw(path, start, end)
+        if os.path.exists(f"{path}.zst"):
+            return self._read_compressed(f"{path}.zst", start, end)
+        raise FileNotFoundError(f"No {stream} ticks for {symbol} on {day}")
+
+    @staticmethod
+    def _check_header(header: bytes, path: str):
+        magic, version, record_size, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"Not a version {VERSION} tick file: {path}")
+
+    def _read_raw(self, path: str, start: int, end: int):
+        with open(path, 'rb') as f:
+            self._check_header(f.read(HEADER.size), path)
+        size = os.path.getsize(path)
+        count = (size - HEADER.size) // RECORD.size
+        if count == 0:
+            return np.empty(0, dtype=TICK_DTYPE) if np is not None else []
+
+        if np is not None:
+            ticks = np.memmap(path, dtype=TICK_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+            lo = 0 if start is None else int(np.searchsorted(ticks['ts'], start, 'left'))
+            hi = count if end is None else int(np.searchsorted(ticks['ts'], end, 'left'))
+            return ticks[lo:hi]
+
+        # Narrow the scan with the sparse index, then filter exactly
+        first = 0
+        index_path = path[:-len('.ticks')] + '.idx'
+        if start is not None and os.path.exists(index_path):
+            with open(index_path, 'rb') as f:
+                entries = list(INDEX.iter_unpack(f.read()))
+            # Last entry strictly before start: nothing earlier can match
+            position = bisect.bisect_left([ts for ts, _ in entries], start) - 1
+            if position >= 0:
+                first = entries[position][1]
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            ticks = []
+            for tick in RECORD.iter_unpack(view[HEADER.size + first * RECORD.size:HEADER.size + count * RECORD.size]):
+                if end is not None and tick[0] >= end:
+                    break
+                if start is None or tick[0] >= start:
+                    ticks.append(tick)
+            return ticks
+
+    def _read_compressed(self, path: str, start: int, end: int):
+        if zstandard is None:
+            raise RuntimeError('Reading compressed tick files requires the zstandard package')
+        decompressor = zstandard.ZstdDecompressor()
+        with open(path, 'rb') as f:
+            data = f.read()
+        self._check_header(data[:HEADER.size], path)
+        index_offset = struct.unpack_from('<q', data, len(data) - 8)[0]
+        blocks = list(struct.iter_unpack('<qqq', data[index_offset:len(data) - 8]))
+
+        # Only decompress blocks that can overlap [start, end)
+        first = 0
+        if start is not None:
+            first = max(0, bisect.bisect_left([ts for ts, _, _ in blocks], start) - 1)
+        raw = bytearray()
+        for ts, offset, length in blocks[first:]:
+            if end is not None and ts >= end:
+                break
+            raw += decompressor.decompress(data[offset:offset + length])
+
+        if np is not None:
+            ticks = np.frombuffer(bytes(raw), dtype=TICK_DTYPE)
+            lo = 0 if start is None else int(np.searchsorted(ticks['ts'], start, 'left'))
+            hi = len(ticks) if end is None else int(np.searchsorted(ticks['ts'], end, 'left'))
+            return ticks[lo:hi]
+        return [tick for tick in RECORD.iter_unpack(raw)
+                if (start is None or tick[0] >= start) and (end is None or tick[0] < end)]
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+
+import requests
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+logger = logging.getLogger(__name__)
+
+# Binance error codes worth retrying: disconnected, too many requests,
+# unknown execution status (timeout waiting for the matching engine) and
+# timestamp outside of recvWindow
+RETRYABLE_ERROR_CODES = {-1001, -1003, -1007, -1021}
+
+# Codes / statuses where the order may or may not have reached the book
+AMBIGUOUS_ERROR_CODES = {-1007}
+
+# Binance error code for "Order does not exist"
+ORDER_NOT_FOUND_CODE = -2013
+
+CLIENT_ORDER_ID_PREFIX = 'tb-'
+
+
+def make_client_order_id(symbol: str, side: str, order_type: str,
+                         quantity: float, price: float = None,
+                         nonce: str = None) -> str:
+    """
+    Build a deterministic newClientOrderId for an order intent
+
+    The same arguments always produce the same id, so a resubmitted order is
+    recognised by Binance (and by our own lookups) as the original one.
+
+    Args:
+        symbol: Trading pair
+        side: BUY or SELL
+        order_type: Order type
+        quantity: Order quantity
+        price: Order price (if any)
+        nonce: Caller supplied value distinguishing otherwise identical intents
+
+    Returns:
+        str: Id matching Binance's ``^[.A-Z:/a-z0-9_-]{1,36}$`` rule
+    """
+    raw = f"{symbol.upper()}|{side.upper()}|{order_type.upper()}|{quantity!r}|{price!r}|{nonce}"
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+    return f"{CLIENT_ORDER_ID_PREFIX}{digest}"
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether an error is transient and the request can be retried"""
+    if isinstance(error, BinanceAPIException):
+        return error.code in RETRYABLE_ERROR_CODES or error.status_code in (429, 500, 502, 503, 504)
+    return isinstance(error, (requests.exceptions.Timeout,
+                              requests.exceptions.ConnectionError,
+                              BinanceRequestException))
+
+
+def is_ambiguous(error: Exception) -> bool:
+    """Check whether the order may have been accepted despite the error"""
+    if isinstance(error, BinanceAPIException):
+        return error.code in AMBIGUOUS_ERROR_CODES or error.status_code >= 500
+    return isinstance(error, (requests.exceptions.Timeout,
+                              requests.exceptions.ConnectionError,
+                              BinanceRequestException))
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker refuses to send a request"""
+    pass
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.2,
+                 max_delay: float = 5.0):
+        """
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Delay before the first retry (seconds)
+            max_delay: Upper bound on any single delay (seconds)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of recent requests
+
+    Every request deposits ``ratio`` tokens; every retry withdraws one. This
+    keeps retries from multiplying load while the exchange is struggling.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0,
+                 max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around exchange order requests
+
+    Opens after ``failure_threshold`` consecutive failures, rejects requests
+    for ``reset_timeout`` seconds, then lets a single probe request through
+    (half-open) before closing again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """Raise CircuitOpenError if requests are currently blocked"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit breaker open, exchange requests suspended")
+                self._state = self.HALF_OPEN
+                return
+            # Half-open: a probe is already in flight
+            raise CircuitOpenError("Circuit breaker half-open, waiting for probe request")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit breaker closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_error(self):
+        """
+        Outcome of a request that failed for a reason unrelated to exchange
+        health (e.g. a local bug); a half-open probe re-opens the breaker so
+        it can never stay half-open, a closed breaker is left alone
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.warning("Circuit breaker probe failed locally, re-opening")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,291 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class RiskCheckError(ValueError):
+    """Raised when an order breaches a pre-trade risk limit"""
+    pass
+
+
+def _env_float(name: str):
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+class RiskLimits:
+    """Pre-trade limits; a limit left as None is not enforced"""
+
+    def __init__(self, max_order_notional: float = None, max_position_qty: float = None,
+                 max_position_notional: float = None, max_orders_per_second: float = None,
+                 price_band_pct: float = None):
+        """
+        Args:
+            max_order_notional: Largest single order value in quote currency
+            max_position_qty: Largest absolute position per symbol after the order
+            max_position_notional: Largest absolute position value per symbol
+            max_orders_per_second: Order rate per account
+            price_band_pct: Max distance of a LIMIT price from the reference
+                price, in percent (fat-finger check)
+        """
+        self.max_order_notional = max_order_notional
+        self.max_position_qty = max_position_qty
+        self.max_position_notional = max_position_notional
+        self.max_orders_per_second = max_orders_per_second
+        self.price_band_pct = price_band_pct
+
+    @classmethod
+    def from_env(cls):
+        """Read limits from RISK_* environment variables"""
+        return cls(
+            max_order_notional=_env_float('RISK_MAX_ORDER_NOTIONAL'),
+            max_position_qty=_env_float('RISK_MAX_POSITION_QTY'),
+            max_position_notional=_env_float('RISK_MAX_POSITION_NOTIONAL'),
+            max_orders_per_second=_env_float('RISK_MAX_ORDERS_PER_SECOND'),
+            price_band_pct=_env_float('RISK_PRICE_BAND_PCT'),
+        )
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class LatencyStats:
+    """Latency of recent risk checks in microseconds"""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ns: int):
+        with self._lock:
+            self.count += 1
+            self.total_ns += elapsed_ns
+            self.max_ns = max(self.max_ns, elapsed_ns)
+            self._recent.append(elapsed_ns)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total_ns, max_ns = self.count, self.total_ns, self.max_ns
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(len(recent) * p))] / 1000 if recent else None
+
+        return {
+            'count': count,
+            'mean_us': total_ns / count / 1000 if count else None,
+            'p50_us': percentile(0.50),
+            'p99_us': percentile(0.99),
+            'max_us': max_ns / 1000
+        }
+
+
+class RiskEngine:
+    """
+    Pre-trade risk checks against an in-memory exposure index
+
+    Positions are kept per (account, symbol) and updated incrementally from
+    fills, so checking an order never needs a REST call. An order that
+    passes check() is reserved as open quantity in the same critical
+    section, and quantity resting in open orders counts towards the
+    position limits on its side, so concurrent or unfilled orders cannot
+    together exceed them. Reference prices come from fills, position
+    snapshots and update_mark_price().
+    """
+
+    def __init__(self, limits: RiskLimits = None, symbol_limits: dict = None):
+        """
+        Args:
+            limits: Default limits
+            symbol_limits: symbol -> RiskLimits overriding the defaults
+        """
+        self.limits = limits or RiskLimits()
+        self.symbol_limits = symbol_limits or {}
+        self.latency = LatencyStats()
+        self.rejections = 0
+        self._positions = {}
+        self._prices = {}
+        self._order_times = {}
+        # (account, symbol) -> {clientOrderId: signed quantity in flight or resting}
+        self._open_orders = {}
+        self._lock = threading.Lock()
+
+    def position(self, account: str, symbol: str) -> float:
+        return self._positions.get((account, symbol), 0.0)
+
+    def open_quantity(self, account: str, symbol: str, side: str) -> float:
+        """Unfilled quantity of open orders on one side"""
+        orders = self._open_orders.get((account, symbol), {})
+        if side.upper() == 'BUY':
+            return sum(qty for qty in list(orders.values()) if qty > 0)
+        return -sum(qty for qty in list(orders.values()) if qty < 0)
+
+    def reference_price(self, symbol: str):
+        return self._prices.get(symbol)
+
+    def update_mark_price(self, symbol: str, price: float):
+        self._prices[symbol] = float(price)
+
+    def sync_positions(self, account: str, positions: list):
+        """Seed the index from futures_position_information()"""
+        with self._lock:
+            for position in positions:
+                symbol = position['symbol']
+                self._positions[(account, symbol)] = float(position.get('positionAmt', 0))
+                if float(position.get('markPrice') or 0):
+                    self._prices[symbol] = float(position['markPrice'])
+        logger.info(f"Risk exposure synced for {account} ({len(positions)} positions)")
+
+    def on_fill(self, account: str, fill: dict):
+        """Apply a fill (symbol, side, quantity, price) to the exposure index"""
+        signed_qty = fill['quantity'] if fill['side'] == 'BUY' else -fill['quantity']
+        key = (account, fill['symbol'])
+        with self._lock:
+            self._positions[key] = self._positions.get(key, 0.0) + signed_qty
+        if fill.get('price'):
+            self._prices[fill['symbol']] = fill['price']
+
+    def on_order(self, account: str, symbol: str, order_key, side: str, remaining: float,
+                 filled: float = 0.0, price: float = None):
+        """
+        Apply an order snapshot: its new fill and the quantity still resting
+
+        The fill moves from the order's open quantity into the position in
+        one step, so a concurrent check never sees it in neither.
+
+        Args:
+            order_key: clientOrderId the order was reserved under
+            remaining: Unfilled quantity still on the book (0 once it is done)
+            filled: Quantity filled since the previous snapshot
+            price: Price of that fill
+        """
+        key = (account, symbol)
+        with self._lock:
+            if filled:
+                self._positions[key] = self._positions.get(key, 0.0) + (
+                    filled if side == 'BUY' else -filled)
+                if price:
+                    self._prices[symbol] = price
+            orders = self._open_orders.setdefault(key, {})
+            if remaining > 1e-12:
+                orders[order_key] = remaining if side == 'BUY' else -remaining
+            else:
+                orders.pop(order_key, None)
+            if not orders:
+                del self._open_orders[key]
+
+    def release(self, account: str, symbol: str, order_key):
+        """Drop the reservation of an order that was never placed"""
+        self.on_order(account, symbol, order_key, 'BUY', 0.0)
+
+    def clear_orders(self, account: str, symbol: str):
+        """Forget all open orders on a symbol (after cancel-all)"""
+        with self._lock:
+            self._open_orders.pop((account, symbol), None)
+
+    def check(self, account: str, symbol: str, side: str, quantity: float, price: float = None,
+              reservation=None):
+        """
+        Check an order against the limits
+
+        Args:
+            reservation: Key (clientOrderId) to reserve the order's quantity
+                under when it passes; on_order() or release() settles it
+
+        Raises:
+            RiskCheckError: If any limit would be breached
+        """
+        started = time.perf_counter_ns()
+        try:
+            # Check and reserve atomically so concurrent orders see each other
+            with self._lock:
+                self._check(account, symbol, side.upper(), quantity, price)
+                if reservation is not None:
+                    self._open_orders.setdefault((account, symbol), {})[reservation] = (
+                        quantity if side.upper() == 'BUY' else -quantity)
+        except RiskCheckError as e:
+            with self._lock:
+                self.rejections += 1
+            logger.warning(f"Risk check rejected {side} {quantity} {symbol} for {account}: {e}")
+            raise
+        finally:
+            self.latency.record(time.perf_counter_ns() - started)
+
+    def _check(self, account, symbol, side, quantity, price):
+        limits = self.symbol_limits.get(symbol, self.limits)
+        reference = self._prices.get(symbol)
+
+        if limits.price_band_pct is not None and price and reference:
+            deviation = abs(price - reference) / reference * 100
+            if deviation > limits.price_band_pct:
+                raise RiskCheckError(
+                    f"Price {price} is {deviation:.2f}% from reference {reference} "
+                    f"(band {limits.price_band_pct}%)"
+                )
+
+        order_price = price or reference
+        if limits.max_order_notional is not None and order_price:
+            notional = quantity * order_price
+            if notional > limits.max_order_notional:
+                raise RiskCheckError(
+                    f"Order notional {notional:.2f} exceeds {limits.max_order_notional}"
+                )
+
+        current = self._positions.get((account, symbol), 0.0)
+        # Worst case: every open order on the same side fills as well
+        exposure = quantity + self.open_quantity(account, symbol, side)
+        projected = current + (exposure if side == 'BUY' else -exposure)
+        # Orders that reduce the position are always allowed through
+        if abs(projected) > abs(current):
+            if limits.max_position_qty is not None and abs(projected) > limits.max_position_qty:
+                raise RiskCheckError(
+                    f"Position {projected} would exceed {limits.max_position_qty} {symbol}"
+                )
+            if limits.max_position_notional is not None and order_price:
+                position_notional = abs(projected) * order_price
+                if position_notional > limits.max_position_notional:
+                    raise RiskCheckError(
+                        f"Position notional {position_notional:.2f} would exceed "
+                        f"{limits.max_position_notional}"
+                    )
+
+        if limits.max_orders_per_second is not None:
+            now = time.monotonic()
+            times = self._order_times.setdefault(account, deque())
+            while times and now - times[0] > 1.0:
+                times.popleft()
+            if len(times) >= limits.max_orders_per_second:
+                raise RiskCheckError(
+                    f"Order rate above {limits.max_orders_per_second}/s"
+                )
+            times.append(now)
+
+    def exposure(self, account: str = None) -> list:
+        """Current positions, optionally for one account"""
+        return [
+            {
+                'account': key[0],
+                'symbol': key[1],
+                'position': qty,
+                'reference_price': self._prices.get(key[1]),
+                'notional': abs(qty) * self._prices.get(key[1], 0.0),
+                'open_buy': self.open_quantity(key[0], key[1], 'BUY'),
+                'open_sell': self.open_quantity(key[0], key[1], 'SELL')
+            }
+            for key, qty in list(self._positions.items())
+            if qty and (account is None or key[0] == account)
+        ]
+
+    def metrics(self) -> dict:
+        return {
+            'checks': self.latency.to_dict(),
+            'rejections': self.rejections,
+            'limits': self.limits.to_dict()
+        }
@@ -0,0 +1,102 @@
+import hashlib
+import hmac
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HmacSigner:
+    """
+    HMAC-SHA256 signer with a precomputed keyed context
+
+    Keying an HMAC hashes the padded secret twice; doing it once and copying
+    the keyed context for every request leaves only the payload to hash.
+    """
+
+    def __init__(self, api_secret: str):
+        self._context = hmac.new(api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+    def sign(self, payload: str) -> str:
+        """Return the hex HMAC-SHA256 signature of ``payload``"""
+        mac = self._context.copy()
+        mac.update(payload.encode('utf-8'))
+        return mac.hexdigest()
+
+
+class ServerTimeSync:
+    """
+    Background tracker of the offset between local and Binance server time
+
+    Each sync takes a few samples of ``futures_time`` and keeps the one with
+    the lowest round-trip time, assuming the server stamped it half way
+    through the round trip. The offset is written to the python-binance
+    client's ``timestamp_offset`` so signed requests carry server time and
+    are not rejected with -1021.
+    """
+
+    def __init__(self, client, interval: float = 30.0, samples: int = 3):
+        """
+        Args:
+            client: python-binance Client to keep in sync
+            interval: Seconds between syncs
+            samples: Round trips measured per sync
+        """
+        self.client = client
+        self.interval = interval
+        self.samples = samples
+        self.offset_ms = 0.0
+        self.rtt_ms = None
+        self.last_sync = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def sync(self) -> float:
+        """Measure the server time offset now and apply it, returning the offset in ms"""
+        best_rtt = None
+        best_offset = None
+        for _ in range(self.samples):
+            sent = time.time()
+            server_time = self.client.futures_time()['serverTime']
+            received = time.time()
+            rtt = (received - sent) * 1000
+            if best_rtt is None or rtt < best_rtt:
+                best_rtt = rtt
+                best_offset = server_time - (sent + received) / 2 * 1000
+
+        with self._lock:
+            self.offset_ms = best_offset
+            self.rtt_ms = best_rtt
+            self.last_sync = time.time()
+            self.client.timestamp_offset = int(best_offset)
+
+        logger.debug(f"Server time offset {best_offset:.1f}ms (rtt {best_rtt:.1f}ms)")
+        return best_offset
+
+    def server_time_ms(self) -> int:
+        """Current Binance server time estimate in milliseconds"""
+        return int(time.time() * 1000 + self.offset_ms)
+
+    def start(self):
+        """Start syncing in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='server-time-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.warning(f"Server time sync failed: {e}")
+            self._stop.wait(self.interval)
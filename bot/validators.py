@@ -1,16 +1,49 @@
 import re
 import logging
+from decimal import Decimal, InvalidOperation
 
 logger = logging.getLogger(__name__)
 
+# Fallback when no symbol listing is available: e.g. BTCUSDT, 1000PEPEUSDT, BTCUSDT_250328
+SYMBOL_PATTERN = re.compile(r'^[0-9A-Z]{5,20}(_[0-9]{6})?$')
+
+
+def on_step(value, minimum: str, step: str) -> bool:
+    """
+    Check that ``value`` lies on the ``minimum + k * step`` grid
+
+    Decimal arithmetic on the shortest string form of the float, so values
+    such as 0.3 with step 0.1 are not rejected by binary rounding.
+    """
+    step = Decimal(step)
+    if step == 0:
+        return True
+    try:
+        return (Decimal(str(value)) - Decimal(minimum)) % step == 0
+    except InvalidOperation:
+        return False
+
+
 class OrderValidator:
     """Validator for order parameters"""
     
     @staticmethod
-    def validate_symbol(symbol: str) -> bool:
-        """Validate symbol format (e.g., BTCUSDT)"""
-        pattern = r'^[A-Z]{3,10}[A-Z]{3,10}$'
-        if not re.match(pattern, symbol):
+    def validate_symbol(symbol: str, symbols: frozenset = None) -> bool:
+        """
+        Validate a symbol
+        
+        Args:
+            symbol: Trading pair symbol
+            symbols: Tradable symbols (see BinanceFuturesClient.tradable_symbols);
+                without them only the symbol format is checked
+        """
+        if symbols is not None:
+            if symbol not in symbols:
+                logger.error(f"Unknown symbol: {symbol}")
+                return False
+            return True
+        
+        if not isinstance(symbol, str) or not SYMBOL_PATTERN.fullmatch(symbol):
             logger.error(f"Invalid symbol format: {symbol}")
             return False
         return True
@@ -27,7 +60,7 @@ class OrderValidator:
     @staticmethod
     def validate_order_type(order_type: str) -> bool:
         """Validate order type"""
-        valid_types = ['MARKET', 'LIMIT']
+        valid_types = ['MARKET', 'LIMIT', 'STOP_MARKET', 'TAKE_PROFIT_MARKET']
         if order_type.upper() not in valid_types:
             logger.error(f"Invalid order type: {order_type}. Must be one of {valid_types}")
             return False
@@ -46,7 +79,7 @@ class OrderValidator:
                 if filter_info['filterType'] == 'LOT_SIZE':
                     min_qty = float(filter_info['minQty'])
                     max_qty = float(filter_info['maxQty'])
-                    step_size = float(filter_info['stepSize'])
+                    step_size = filter_info['stepSize']
                     
                     if quantity < min_qty:
                         logger.error(f"Quantity below minimum: {quantity} < {min_qty}")
@@ -56,8 +89,7 @@ class OrderValidator:
                         return False
                     
                     # Check step size
-                    remainder = (quantity - min_qty) % step_size
-                    if remainder > 1e-10:  # Allow for floating point precision
+                    if not on_step(quantity, filter_info['minQty'], step_size):
                         logger.error(f"Quantity must be multiple of step size: {step_size}")
                         return False
         
@@ -77,7 +109,7 @@ class OrderValidator:
                     if filter_info['filterType'] == 'PRICE_FILTER':
                         min_price = float(filter_info['minPrice'])
                         max_price = float(filter_info['maxPrice'])
-                        tick_size = float(filter_info['tickSize'])
+                        tick_size = filter_info['tickSize']
                         
                         if price < min_price:
                             logger.error(f"Price below minimum: {price} < {min_price}")
@@ -87,8 +119,7 @@ class OrderValidator:
                             return False
                         
                         # Check tick size
-                        remainder = (price - min_price) % tick_size
-                        if remainder > 1e-10:
+                        if not on_step(price, filter_info['minPrice'], tick_size):
                             logger.error(f"Price must be multiple of tick size: {tick_size}")
                             return False
         
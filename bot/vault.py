@@ -0,0 +1,210 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Optional: required only when a vault key is configured
+    Fernet = None
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: writers there are not serialised across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+KDF_ITERATIONS = 390_000
+
+
+def mask(value: str, visible: int = 4) -> str:
+    """Hide all but the last ``visible`` characters of a credential"""
+    if not value:
+        return ''
+    if len(value) <= visible * 2:
+        return '*' * len(value)
+    return '*' * (len(value) - visible) + value[-visible:]
+
+
+class CredentialVault:
+    """
+    File-backed store of per-account API credentials
+
+    With a passphrase the credentials are encrypted with Fernet (AES-128-CBC
+    + HMAC-SHA256) under a key derived by PBKDF2; the salt is kept in the
+    file. Without one they are stored as plain JSON readable only by the
+    owner. Writes are atomic (temp file + rename), so other processes
+    watching the file never see a partial update, and changes are made
+    under an exclusive lock on ``<path>.lock`` against the latest file, so
+    workers updating different accounts do not undo each other.
+    """
+
+    def __init__(self, path: str, passphrase: str = None):
+        """
+        Args:
+            path: Vault file (created on the first save)
+            passphrase: Encrypts the vault at rest (needs the cryptography package)
+        """
+        if passphrase and Fernet is None:
+            raise RuntimeError('An encrypted credential vault requires the cryptography package')
+        self.path = path
+        self.passphrase = passphrase
+        self._accounts = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if os.path.exists(path):
+            self.load()
+
+    @classmethod
+    def from_env(cls):
+        """Vault at VAULT_PATH encrypted with VAULT_KEY, or None when VAULT_PATH is unset"""
+        path = os.getenv('VAULT_PATH')
+        if not path:
+            return None
+        return cls(path, os.getenv('VAULT_KEY') or None)
+
+    @property
+    def encrypted(self) -> bool:
+        return bool(self.passphrase)
+
+    def _fernet(self, salt: bytes):
+        key = hashlib.pbkdf2_hmac('sha256', self.passphrase.encode('utf-8'), salt, KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def load(self):
+        """Read the vault file, replacing the in-memory credentials"""
+        with open(self.path) as f:
+            document = json.load(f)
+
+        if 'ciphertext' in document:
+            if not self.passphrase:
+                raise RuntimeError(f"{self.path} is encrypted but no passphrase was given")
+            salt = base64.b64decode(document['salt'])
+            try:
+                payload = self._fernet(salt).decrypt(document['ciphertext'].encode('ascii'))
+            except InvalidToken:
+                raise RuntimeError(f"Wrong passphrase for {self.path}") from None
+            accounts = json.loads(payload)
+        else:
+            accounts = document.get('accounts', {})
+
+        with self._lock:
+            self._accounts = {name: (entry['api_key'], entry['api_secret'])
+                              for name, entry in accounts.items()}
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the cross-process lock guarding read-modify-write of the file"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # Closing releases the lock
+
+    def save(self):
+        """Write the in-memory credentials to disk atomically"""
+        with self._file_lock():
+            self._write()
+
+    def _update(self, change):
+        """Apply ``change(accounts)`` to the latest file contents and save them"""
+        with self._file_lock():
+            if os.path.exists(self.path):
+                self.load()
+            with self._lock:
+                change(self._accounts)
+            self._write()
+
+    def _write(self):
+        with self._lock:
+            accounts = {name: {'api_key': key, 'api_secret': secret}
+                        for name, (key, secret) in self._accounts.items()}
+
+        if self.passphrase:
+            salt = os.urandom(16)
+            token = self._fernet(salt).encrypt(json.dumps(accounts).encode('utf-8'))
+            document = {'version': VERSION, 'kdf': 'pbkdf2-sha256', 'iterations': KDF_ITERATIONS,
+                        'salt': base64.b64encode(salt).decode('ascii'),
+                        'ciphertext': token.decode('ascii')}
+        else:
+            logger.warning(f"Credential vault {self.path} is not encrypted (set VAULT_KEY)")
+            document = {'version': VERSION, 'accounts': accounts}
+
+        # Unique temp file (mode 0600) in the same directory, so the rename is atomic
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.path)}.", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(document, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+    def accounts(self) -> dict:
+        """account name -> (api_key, api_secret)"""
+        with self._lock:
+            return dict(self._accounts)
+
+    def get(self, account: str):
+        """(api_key, api_secret) for an account, or None"""
+        with self._lock:
+            return self._accounts.get(account)
+
+    def set(self, account: str, api_key: str, api_secret: str):
+        """Store an account's credentials and save the vault"""
+        self._update(lambda accounts: accounts.__setitem__(account, (api_key, api_secret)))
+
+    def remove(self, account: str):
+        """Delete an account's credentials and save the vault"""
+        self._update(lambda accounts: accounts.pop(account, None))
+
+    def reload_if_changed(self) -> bool:
+        """Reload when another process rewrote the file; return whether it changed"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        logger.info(f"Credential vault {self.path} reloaded")
+        return True
+
+    def watch(self, callback, interval: float = 5.0):
+        """Call ``callback(accounts)`` from a daemon thread whenever the file changes"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    if self.reload_if_changed():
+                        callback(self.accounts())
+                except Exception as e:
+                    logger.error(f"Credential vault reload failed: {e}")
+
+        self._thread = threading.Thread(target=run, name='credential-vault', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the file"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
@@ -1,14 +1,22 @@
 #!/usr/bin/env python3
 #!/usr/bin/env python3
 import click
+import csv
+import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
 import logging
+import time
 
 from bot.client import BinanceFuturesClient
 from bot.orders import OrderManager
+from bot.heartbeat import AutoCancelHeartbeat, MIN_COUNTDOWN
 from bot.validators import OrderValidator
 from bot.logging_config import setup_logging
+from bot.retry import make_client_order_id
+from bot.vault import CredentialVault, mask
 
 # Load environment variables
 load_dotenv()
@@ -169,5 +177,296 @@ def symbol_info(symbol, api_key, api_secret):
     except Exception as e:
         click.echo(f"Error: {str(e)}")
 
+@cli.command()
+@click.option('--symbol', required=True, help='Trading symbol (e.g., BTCUSDT)')
+@click.option('--order-id', 'order_ids', required=True, multiple=True, type=int,
+              help='Order ID to cancel (repeatable)')
+@click.option('--api-key', envvar='BINANCE_API_KEY', help='Binance API key')
+@click.option('--api-secret', envvar='BINANCE_API_SECRET', help='Binance API secret')
+def cancel_orders(symbol, order_ids, api_key, api_secret):
+    """Cancel several orders on a symbol in batches"""
+    
+    if not api_key or not api_secret:
+        click.echo(" API credentials not found")
+        return
+    
+    try:
+        client = BinanceFuturesClient(api_key, api_secret, testnet=True)
+        order_manager = OrderManager(client)
+        results = order_manager.cancel_orders(symbol, list(order_ids))
+        
+        click.echo(f"\n Cancel results for {symbol}:")
+        for result in results:
+            if 'orderId' in result:
+                click.echo(f"   {result['orderId']}: {result.get('status')}")
+            else:
+                click.echo(f"   Error {result.get('code')}: {result.get('msg')}")
+    
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command()
+@click.option('--symbol', 'symbols', multiple=True,
+              help='Symbol to flatten (repeatable, default: all symbols with open orders)')
+@click.option('--yes', is_flag=True, help='Skip confirmation')
+@click.option('--api-key', envvar='BINANCE_API_KEY', help='Binance API key')
+@click.option('--api-secret', envvar='BINANCE_API_SECRET', help='Binance API secret')
+def cancel_all(symbols, yes, api_key, api_secret):
+    """Cancel all open orders, concurrently across symbols"""
+    
+    if not api_key or not api_secret:
+        click.echo(" API credentials not found")
+        return
+    
+    target = ', '.join(symbols) if symbols else 'ALL symbols'
+    if not yes and not click.confirm(f"\n  Cancel all open orders on {target}?"):
+        click.echo("Aborted")
+        return
+    
+    try:
+        client = BinanceFuturesClient(api_key, api_secret, testnet=True)
+        order_manager = OrderManager(client)
+        results = order_manager.cancel_all_symbols(list(symbols) or None)
+        
+        if not results:
+            click.echo("No open orders")
+        for symbol, result in results.items():
+            if 'error' in result:
+                click.echo(f"   {symbol}: Error {result['error']}")
+            else:
+                click.echo(f"   {symbol}: {result.get('msg', 'cancelled')}")
+    
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command()
+@click.option('--symbol', 'symbols', required=True, multiple=True,
+              help='Symbol to protect (repeatable)')
+@click.option('--countdown', default=60.0, type=click.FloatRange(min=MIN_COUNTDOWN),
+              help='Seconds without heartbeat before orders are cancelled')
+@click.option('--api-key', envvar='BINANCE_API_KEY', help='Binance API key')
+@click.option('--api-secret', envvar='BINANCE_API_SECRET', help='Binance API secret')
+def auto_cancel(symbols, countdown, api_key, api_secret):
+    """Keep cancel-on-disconnect armed until interrupted"""
+    
+    if not api_key or not api_secret:
+        click.echo(" API credentials not found")
+        return
+    
+    heartbeat = None
+    try:
+        client = BinanceFuturesClient(api_key, api_secret, testnet=True)
+        heartbeat = AutoCancelHeartbeat(OrderManager(client), countdown=countdown)
+        for symbol in symbols:
+            heartbeat.add_symbol(symbol)
+        
+        click.echo(f" Auto-cancel armed for {', '.join(symbols)} "
+                   f"({countdown}s countdown). Press Ctrl+C to stop.")
+        while True:
+            time.sleep(1)
+    
+    except KeyboardInterrupt:
+        click.echo("\n Stopping heartbeat, disarming countdown")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+    finally:
+        if heartbeat:
+            heartbeat.stop()
+
+@cli.command()
+@click.option('--account', default='default', show_default=True, help='Account name')
+@click.option('--api-key', prompt=True, help='New Binance API key')
+@click.option('--api-secret', prompt=True, hide_input=True, help='New Binance API secret')
+@click.option('--vault', 'vault_path', envvar='VAULT_PATH', required=True,
+              help='Credential vault file (VAULT_PATH)')
+@click.option('--vault-key', envvar='VAULT_KEY', help='Vault passphrase (VAULT_KEY)')
+def set_credentials(account, api_key, api_secret, vault_path, vault_key):
+    """Store or rotate an account's keys in the credential vault
+    
+    Running API servers using the same vault pick the new keys up within
+    seconds, without a restart.
+    """
+    try:
+        vault = CredentialVault(vault_path, vault_key)
+        vault.set(account, api_key, api_secret)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+    
+    click.echo(f"Credentials for {account} saved to {vault_path} "
+               f"({'encrypted' if vault.encrypted else 'NOT encrypted, set VAULT_KEY'})")
+    click.echo(f"   API key: {mask(api_key)}")
+
+def read_orders(stream, fmt):
+    """Yield (line number, order dict) from a CSV or JSON-lines stream"""
+    if fmt == 'csv':
+        for line_no, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, row
+        return
+    
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, {'_error': f'Invalid JSON: {e}'}
+
+def normalize_order(record):
+    """Map a raw CSV/JSON record to place_order arguments"""
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    
+    order_type = (record.get('order_type') or record.get('type') or '').upper()
+    price = record.get('price')
+    return {
+        'symbol': (record.get('symbol') or '').upper(),
+        'side': (record.get('side') or '').upper(),
+        'order_type': order_type,
+        'quantity': float(record.get('quantity') or 0),
+        'price': float(price) if price not in (None, '') else None,
+        'client_order_id': record.get('client_order_id') or None
+    }
+
+def validate_order(order, symbol_info=None, symbols=None):
+    """Return an error message for an invalid order, or None"""
+    if not OrderValidator.validate_symbol(order['symbol'], symbols):
+        return f"Invalid symbol: {order['symbol']}"
+    if not OrderValidator.validate_side(order['side']):
+        return f"Invalid side: {order['side']}"
+    if order['order_type'] not in ('MARKET', 'LIMIT'):
+        return f"Invalid order type: {order['order_type']}"
+    if not OrderValidator.validate_quantity(order['quantity'], symbol_info):
+        return f"Invalid quantity: {order['quantity']}"
+    if order['order_type'] == 'LIMIT':
+        if order['price'] is None:
+            return "Price is required for LIMIT orders"
+        if not OrderValidator.validate_price(order['price'], 'LIMIT', symbol_info):
+            return f"Invalid price: {order['price']}"
+    return None
+
+@cli.command()
+@click.argument('source', type=click.File('r'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(['auto', 'csv', 'jsonl']), default='auto',
+              help='Input format (auto: by file extension, JSON lines for stdin)')
+@click.option('--output', type=click.File('w'), default='-',
+              help='Where to write JSON-lines results (default: stdout)')
+@click.option('--max-in-flight', default=8, type=click.IntRange(min=1), help='Concurrent order requests')
+@click.option('--batch-id', default=None,
+              help='Idempotency key for the batch; rerunning with the same id skips orders '
+                   'that were already placed')
+@click.option('--dry-run', is_flag=True, help='Validate only, do not place orders')
+@click.option('--yes', is_flag=True, help='Skip confirmation')
+@click.option('--api-key', envvar='BINANCE_API_KEY', help='Binance API key')
+@click.option('--api-secret', envvar='BINANCE_API_SECRET', help='Binance API secret')
+def place_batch(source, fmt, output, max_in_flight, batch_id, dry_run, yes, api_key, api_secret):
+    """Place orders streamed from a CSV / JSON-lines file or stdin"""
+    
+    if fmt == 'auto':
+        fmt = 'csv' if source.name.lower().endswith('.csv') else 'jsonl'
+    
+    if not dry_run and not yes:
+        if source.name == '<stdin>':
+            click.echo("Reading orders from stdin requires --yes (or --dry-run)", err=True)
+            return
+        if not click.confirm(f"Place all orders from {source.name} on Binance Futures Testnet?", err=True):
+            click.echo("Aborted", err=True)
+            return
+    
+    # Per-order log lines would drown the progress line
+    for handler in logging.getLogger().handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.WARNING)
+    
+    client = None
+    order_manager = None
+    if api_key and api_secret:
+        try:
+            client = BinanceFuturesClient(api_key, api_secret, testnet=True)
+            order_manager = OrderManager(client)
+        except Exception as e:
+            click.echo(f"Error: {str(e)}", err=True)
+            return
+    elif not dry_run:
+        click.echo(" API credentials not found. Set BINANCE_API_KEY and BINANCE_API_SECRET", err=True)
+        return
+    
+    # Client ids only repeat across runs for a given batch id or explicit
+    # ids; Binance rejects a reused id only while that order is still open,
+    # so those lines are looked up before being sent
+    resume = batch_id is not None
+    batch_id = batch_id or str(time.time_ns())
+    counts = {'ok': 0, 'error': 0}
+    started = time.monotonic()
+    
+    def process(line_no, record):
+        result = {'line': line_no}
+        try:
+            order = normalize_order(record)
+            result['symbol'] = order['symbol']
+            
+            # Symbol listing and rules come from the client's cached exchange info
+            symbols = client.tradable_symbols() if client else None
+            symbol_info = (client.get_symbol_info(order['symbol'])
+                           if symbols and order['symbol'] in symbols else None)
+            error = validate_order(order, symbol_info, symbols)
+            if error:
+                raise ValueError(error)
+            
+            lookup = resume or order['client_order_id'] is not None
+            if order['client_order_id'] is None:
+                order['client_order_id'] = make_client_order_id(
+                    order['symbol'], order['side'], order['order_type'],
+                    order['quantity'], order['price'], nonce=f"{batch_id}:{line_no}"
+                )
+            result['client_order_id'] = order['client_order_id']
+            
+            existing = None
+            if lookup and order_manager is not None:
+                existing = order_manager.find_order(order['symbol'], order['client_order_id'])
+            
+            if existing is not None:
+                result['status'] = 'exists'
+                result['order'] = existing
+            elif dry_run:
+                result['status'] = 'valid'
+            else:
+                response = order_manager.place_order(**order)
+                result['status'] = 'placed'
+                result['order'] = response
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+        return result
+    
+    def emit(result):
+        counts['error' if result['status'] == 'error' else 'ok'] += 1
+        output.write(json.dumps(result) + '\n')
+        done = counts['ok'] + counts['error']
+        rate = done / max(time.monotonic() - started, 1e-9)
+        click.echo(f"\r {done} orders  ok={counts['ok']}  errors={counts['error']}  "
+                   f"{rate:.1f}/s", nl=False, err=True)
+    
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        in_flight = set()
+        for line_no, record in read_orders(source, fmt):
+            if len(in_flight) >= max_in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    emit(future.result())
+            in_flight.add(executor.submit(process, line_no, record))
+        for future in wait(in_flight).done:
+            emit(future.result())
+    
+    elapsed = time.monotonic() - started
+    total = counts['ok'] + counts['error']
+    click.echo(f"\n {'Validated' if dry_run else 'Placed'} {counts['ok']}/{total} orders "
+               f"in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.1f} orders/s), "
+               f"{counts['error']} errors", err=True)
+    
+    if counts['error']:
+        sys.exit(1)
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_exchange import start_stub  # noqa: E402
+from bot.client import BinanceFuturesClient  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    """Local stub exchange; tests script faults through ``stub.exchange``"""
+    server, url = start_stub()
+    server.url = url
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(stub):
+    return BinanceFuturesClient('test-key', 'test-secret', futures_url=stub.url,
+                                time_sync_interval=0)
+
+
+@pytest.fixture
+def calls(stub, monkeypatch):
+    """Count order placements and lookups reaching the stub"""
+    counts = {'new_order': 0, 'find_order': 0}
+    exchange = stub.exchange
+    for name in counts:
+        original = getattr(exchange, name)
+
+        def counted(*args, _name=name, _original=original, **kwargs):
+            counts[_name] += 1
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(exchange, name, counted)
+    return counts
+
+
+def script_faults(exchange, *faults):
+    """Make the next order requests fail as listed ('drop' / 'error'), then succeed"""
+    remaining = iter(faults)
+    exchange.fault = lambda: next(remaining, None)
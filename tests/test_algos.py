@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from bot.algos import (COMPLETED, FAILED, RUNNING, BracketAlgo, ExecutionEngine, IcebergAlgo,
+                       SimulatedClock, TWAPAlgo)
+from bot.orders import OrderManager
+
+
+@pytest.fixture
+def engine(client):
+    engine = ExecutionEngine(OrderManager(client), clock=SimulatedClock(0))
+    yield engine
+    engine.stop()
+
+
+def run(engine, seconds):
+    asyncio.run(engine.run_for(seconds))
+
+
+def fill_open_orders(exchange):
+    """Fill every resting LIMIT order, as the market would"""
+    for order in exchange.orders.values():
+        if order['status'] == 'NEW':
+            order.update(status='FILLED', executedQty=order['origQty'], avgPrice=order['price'])
+
+
+def test_twap_spreads_slices_over_duration(stub, engine):
+    algo = TWAPAlgo('BTCUSDT', 'BUY', 0.05, duration=40, slices=5)
+    engine.submit(algo)
+    run(engine, 20)
+
+    # Slices at t=0, 10, 20 are out; the rest are still scheduled
+    assert algo.state == RUNNING
+    assert len(stub.exchange.orders) == 3
+
+    run(engine, 30)
+    assert algo.state == COMPLETED
+    assert algo.filled_qty == pytest.approx(0.05)
+    assert sorted(float(order['origQty']) for order in stub.exchange.orders.values()) == [0.01] * 5
+
+
+@pytest.mark.parametrize('params', [
+    {'quantity': 0, 'duration': 10, 'slices': 2},
+    {'quantity': -1, 'duration': 10, 'slices': 2},
+    {'quantity': 0.05, 'duration': 10, 'slices': 0},
+    {'quantity': 0.05, 'duration': -1, 'slices': 2},
+])
+def test_twap_rejects_invalid_parameters(params):
+    with pytest.raises(ValueError):
+        TWAPAlgo('BTCUSDT', 'BUY', **params)
+
+
+def test_iceberg_sends_next_clip_after_fill(stub, engine):
+    algo = IcebergAlgo('BTCUSDT', 'SELL', 0.05, price=50000, display_qty=0.02)
+    engine.submit(algo)
+
+    quantities = []
+    for _ in range(3):
+        run(engine, 2)
+        live = [order for order in stub.exchange.orders.values() if order['status'] == 'NEW']
+        assert len(live) == 1
+        quantities.append(float(live[0]['origQty']))
+        fill_open_orders(stub.exchange)
+    run(engine, 2)
+
+    assert quantities == [0.02, 0.02, 0.01]
+    assert algo.state == COMPLETED
+    assert algo.filled_qty == pytest.approx(0.05)
+
+
+def legs(exchange):
+    return {order['orderType']: order for order in exchange.algo_orders.values()}
+
+
+def test_bracket_cancels_other_leg_when_one_triggers(stub, engine):
+    algo = BracketAlgo('BTCUSDT', 'BUY', 0.01, stop_loss=49000, take_profit=51000)
+    engine.submit(algo)
+    run(engine, 2)
+
+    placed = legs(stub.exchange)
+    assert set(placed) == {'STOP_MARKET', 'TAKE_PROFIT_MARKET'}
+    placed['TAKE_PROFIT_MARKET']['algoStatus'] = 'FINISHED'
+    run(engine, 2)
+
+    assert algo.state == COMPLETED
+    assert placed['STOP_MARKET']['algoStatus'] == 'CANCELED'
+
+
+def test_bracket_replaces_leg_cancelled_without_triggering(stub, engine):
+    algo = BracketAlgo('BTCUSDT', 'BUY', 0.01, stop_loss=49000, take_profit=51000)
+    engine.submit(algo)
+    run(engine, 2)
+
+    legs(stub.exchange)['STOP_MARKET']['algoStatus'] = 'CANCELED'
+    run(engine, 2)
+
+    stops = [order for order in stub.exchange.algo_orders.values()
+             if order['orderType'] == 'STOP_MARKET']
+    assert [order['algoStatus'] for order in stops] == ['CANCELED', 'NEW']
+    assert algo.state == RUNNING
+
+
+def test_bracket_flattens_when_leg_cannot_be_placed(stub, engine, monkeypatch):
+    order_manager = engine.order_manager
+    place_order = order_manager.place_order
+
+    def refuse_stop(**kwargs):
+        if kwargs['order_type'] == 'STOP_MARKET':
+            raise RuntimeError('rejected')
+        return place_order(**kwargs)
+
+    monkeypatch.setattr(order_manager, 'place_order', refuse_stop)
+    algo = BracketAlgo('BTCUSDT', 'BUY', 0.01, stop_loss=49000, take_profit=51000,
+                       leg_attempts=2)
+    engine.submit(algo)
+    run(engine, 5)
+
+    assert algo.state == FAILED
+    assert 'flattened' in algo.error
+    # The take-profit leg is cancelled and the entry closed at market
+    assert legs(stub.exchange)['TAKE_PROFIT_MARKET']['algoStatus'] == 'CANCELED'
+    orders = list(stub.exchange.orders.values())
+    assert [(order['side'], order['type'], order['reduceOnly']) for order in orders] == [
+        ('BUY', 'MARKET', False), ('SELL', 'MARKET', True)]
@@ -0,0 +1,115 @@
+import random
+import time
+
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from bot.orders import OrderManager
+from bot.retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+from conftest import script_faults
+
+
+def make_manager(client, max_attempts=5, budget=None, breaker=None):
+    return OrderManager(
+        client,
+        retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0),
+        retry_budget=budget or RetryBudget(min_tokens=100),
+        circuit_breaker=breaker or CircuitBreaker(failure_threshold=100),
+    )
+
+
+def test_dropped_response_is_found_not_resent(stub, client, calls):
+    script_faults(stub.exchange, 'drop')
+    order = make_manager(client).place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+
+    # The order landed before the connection dropped: looked up, not sent again
+    assert calls == {'new_order': 1, 'find_order': 1}
+    assert len(stub.exchange.orders) == 1
+    assert order['clientOrderId'] in stub.exchange.by_client_id
+
+
+def test_unplaced_order_is_looked_up_before_resend(stub, client, calls):
+    script_faults(stub.exchange, 'error')
+    make_manager(client).place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+
+    # A 5xx is ambiguous: lookup (-2013) first, then the one real placement
+    assert calls == {'new_order': 1, 'find_order': 1}
+    assert len(stub.exchange.orders) == 1
+
+
+def test_conditional_order_retry_uses_client_algo_id(stub, client):
+    script_faults(stub.exchange, 'drop')
+    make_manager(client).place_order('BTCUSDT', 'SELL', 'STOP_MARKET', 0.01,
+                                     stopPrice=45000, reduceOnly='true')
+
+    assert len(stub.exchange.algo_orders) == 1
+
+
+def test_no_duplicates_under_random_faults(stub, client):
+    random.seed(7)
+    stub.exchange.drop_rate = 0.3
+    stub.exchange.error_rate = 0.2
+    manager = make_manager(client, max_attempts=20)
+
+    placed = [manager.place_order('ETHUSDT', 'BUY', 'MARKET', 0.01) for _ in range(30)]
+
+    assert len(stub.exchange.orders) == 30
+    assert len({order['clientOrderId'] for order in placed}) == 30
+
+
+def test_retry_budget_exhaustion_stops_retries(stub, client, monkeypatch):
+    attempts = []
+    monkeypatch.setattr(stub.exchange, 'fault', lambda: attempts.append(1) or 'error')
+    manager = make_manager(client, max_attempts=10, budget=RetryBudget(ratio=0, min_tokens=2))
+
+    with pytest.raises(BinanceAPIException):
+        manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+
+    # First attempt plus the two retries the budget allowed
+    assert len(attempts) == 3
+    assert stub.exchange.orders == {}
+
+
+def test_circuit_breaker_opens_and_closes(stub, client, calls):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    manager = make_manager(client, max_attempts=1, breaker=breaker)
+
+    stub.exchange.error_rate = 1.0
+    for _ in range(2):
+        with pytest.raises(BinanceAPIException):
+            manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Open: rejected locally without reaching the exchange
+    lookups = calls['find_order']
+    with pytest.raises(CircuitOpenError):
+        manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+    assert calls['find_order'] == lookups
+
+    time.sleep(0.25)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    stub.exchange.error_rate = 0.0
+    manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert len(stub.exchange.orders) == 1
+
+
+def test_local_error_during_probe_reopens_breaker(stub, client, monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    manager = make_manager(client, max_attempts=1, breaker=breaker)
+    breaker.record_failure()
+    time.sleep(0.25)
+
+    def broken(**params):
+        raise KeyError('local bug')
+
+    monkeypatch.setattr(client.client, 'futures_create_order', broken)
+    with pytest.raises(KeyError):
+        manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+
+    # Not stuck half-open: open again, and the next probe can close it
+    assert breaker.state == CircuitBreaker.OPEN
+    monkeypatch.undo()
+    time.sleep(0.25)
+    manager.place_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
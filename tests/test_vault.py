@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from bot.pool import ClientPool
+from bot.vault import CredentialVault
+
+
+def test_encrypted_vault_round_trip(tmp_path):
+    pytest.importorskip('cryptography')
+    path = str(tmp_path / 'vault.json')
+    CredentialVault(path, 'correct horse').set('alice', 'alice-key', 'alice-secret')
+
+    with open(path) as f:
+        document = json.load(f)
+    assert 'ciphertext' in document
+    assert 'alice-secret' not in json.dumps(document)
+    assert CredentialVault(path, 'correct horse').get('alice') == ('alice-key', 'alice-secret')
+
+
+def test_encrypted_vault_rejects_wrong_passphrase(tmp_path):
+    pytest.importorskip('cryptography')
+    path = str(tmp_path / 'vault.json')
+    CredentialVault(path, 'correct horse').set('alice', 'alice-key', 'alice-secret')
+
+    with pytest.raises(RuntimeError, match='Wrong passphrase'):
+        CredentialVault(path, 'battery staple')
+
+
+def test_reload_drops_accounts_removed_from_vault(tmp_path):
+    vault = CredentialVault(str(tmp_path / 'vault.json'))
+    vault.set('alice', 'alice-key', 'alice-secret')
+    vault.set('bob', 'bob-key', 'bob-secret')
+    pool = ClientPool(accounts={'default': ('env-key', 'env-secret')}, vault=vault)
+    try:
+        vault.remove('bob')
+        pool.reload_credentials()
+
+        # Accounts configured outside the vault are kept
+        assert pool.accounts() == ['alice', 'default']
+        assert pool.get_client('bob') is None
+    finally:
+        vault.stop()